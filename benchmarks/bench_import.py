@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+This script measures the time of `import gifmaze` in fresh
+interpreters and checks which heavy modules are imported with it.
+`PIL` and `tqdm` should not be loaded until they are needed.
+"""
+import subprocess
+import sys
+
+
+CODE = '''
+import sys, time
+start = time.time()
+import gifmaze
+elapsed = time.time() - start
+print(elapsed, int('PIL' in sys.modules), int('tqdm' in sys.modules))
+'''
+
+runs = 20
+times = []
+for _ in range(runs):
+    output = subprocess.check_output([sys.executable, '-c', CODE])
+    elapsed, pil, tqdm = output.split()
+    times.append(float(elapsed))
+
+times.sort()
+print('import gifmaze: median {:.2f} ms, min {:.2f} ms over {} runs'.format(
+    1000 * times[runs // 2], 1000 * times[0], runs))
+print('PIL imported: {}, tqdm imported: {}'.format(bool(int(pil)), bool(int(tqdm))))
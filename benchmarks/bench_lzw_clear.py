@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+This script compares the two clear policies of `lzw_compress`
+on large full-maze frames:
+
+1. 'eager': clear the code table as soon as it's full.
+2. 'adaptive': keep using the full table until its compression
+    ratio degrades.
+
+For each frame it prints the compressed size and the encoding time
+of both policies.
+"""
+import random
+import time
+import gifmaze as gm
+from gifmaze import encoder
+from gifmaze.algorithms import kruskal, bfs
+
+
+def pixels(maze, cmap, scale):
+    """Pixels of the whole maze scaled by `scale`."""
+    return [cmap.get(maze.get_cell((x // scale, y // scale)), 0)
+            for y in range(maze.height * scale)
+            for x in range(maze.width * scale)]
+
+
+def run(algo, maze, **kwargs):
+    """Run an algorithm to the end without rendering any frames."""
+    for _ in algo(maze, lambda m: m.reset(), speed=maze.width * maze.height, **kwargs):
+        pass
+
+
+random.seed(42)
+maze = gm.Maze(301, 201, None)
+run(kruskal, maze)
+frames = [('kruskal, scale 1', pixels(maze, {0: 0, 1: 1}, 1), 2),
+          ('kruskal, scale 4', pixels(maze, {0: 0, 1: 1}, 4), 2)]
+
+run(bfs, maze, start=(0, 0), end=(maze.width - 1, maze.height - 1))
+cmap = {i: max(i % 256, 3) for i in range(maze.width * maze.height)}
+cmap.update({0: 0, 1: 0, 2: 2})
+frames.append(('bfs distances, scale 2', pixels(maze, cmap, 2), 8))
+
+print('{:<24}{:>10}{:>10}{:>10}{:>10}{:>8}'.format(
+    'frame', 'eager', 'time', 'adaptive', 'time', 'ratio'))
+
+for name, data, mcl in frames:
+    result = []
+    for clear in ('eager', 'adaptive'):
+        start = time.time()
+        size = len(encoder.lzw_compress(data, mcl, clear))
+        result += [size, time.time() - start]
+
+    print('{:<24}{:>10}{:>10.2f}{:>10}{:>10.2f}{:>8.3f}'.format(
+        name, result[0], result[1], result[2], result[3],
+        float(result[2]) / result[0]))
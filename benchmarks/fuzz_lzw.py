@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+This script checks the LZW encoder against the in-tree decoder:
+
+1. random inputs (noise, runs and gradients of various lengths) are
+   compressed by `lzw_compress` with both clear policies, and by
+   `LZWEncoder` in random chunks, and decoded back.
+2. random bytes and damaged compressed streams are decoded, the decoder
+   must either decode them or raise `ValueError`.
+3. a whole animation is rendered, saved and decoded, and the number of
+   frames and the final image are compared with the maze.
+
+Run it with an optional number of random cases (default 500).
+"""
+import os
+import random
+import sys
+import tempfile
+import gifmaze as gm
+from gifmaze import encoder, decoder
+from gifmaze.algorithms import prim
+
+
+def random_input(mcl):
+    """Random pixels that stress different parts of the code table."""
+    ncolors = 1 << mcl
+    n = random.choice([0, 1, 2, random.randint(1, 100), random.randint(1000, 20000)])
+    kind = random.choice(['noise', 'runs', 'gradient'])
+    if kind == 'noise':
+        return [random.randrange(ncolors) for _ in range(n)]
+    if kind == 'runs':
+        pixels = []
+        while len(pixels) < n:
+            pixels += [random.randrange(ncolors)] * random.randint(1, 50)
+        return pixels[:n]
+    return [(i // random.randint(1, 8)) % ncolors for i in range(n)]
+
+
+def unpack(data):
+    """Split the output of `lzw_compress` into the code length and the codes."""
+    codes, pos = decoder._sub_blocks(bytearray(data), 1)
+    assert pos == len(data), 'trailing bytes after the terminator'
+    return data[0], codes
+
+
+def check_case():
+    mcl = random.randint(2, 8)
+    pixels = random_input(mcl)
+    if not pixels:
+        return
+    for clear in ('eager', 'adaptive'):
+        data = encoder.lzw_compress(pixels, mcl, clear)
+        code_length, codes = unpack(data)
+        assert code_length == mcl
+        assert list(decoder.lzw_decompress(codes, mcl)) == pixels, (mcl, clear, len(pixels))
+
+        # the incremental encoder in random chunks gives the same bytes.
+        lzw = encoder.LZWEncoder(mcl, clear)
+        chunks = bytearray()
+        i = 0
+        while i < len(pixels):
+            k = random.randint(1, 3000)
+            chunks += lzw.feed(pixels[i: i + k])
+            i += k
+        chunks += lzw.finish()
+        assert chunks == data, (mcl, clear, len(pixels))
+
+
+def check_malformed():
+    """Decode random bytes or a damaged stream, only `ValueError` may escape."""
+    mcl = random.randint(2, 8)
+    if random.random() < 0.5:
+        data = bytearray(random.randrange(256) for _ in range(random.randint(0, 200)))
+    else:
+        _, data = unpack(encoder.lzw_compress(random_input(mcl) or [0], mcl))
+        data = bytearray(data)
+        for _ in range(random.randint(1, 5)):
+            data[random.randrange(len(data))] = random.randrange(256)
+    try:
+        decoder.lzw_decompress(data, mcl)
+    except ValueError:
+        pass
+    except Exception as e:
+        raise AssertionError('{!r} escaped for mcl={} and data={!r}'.format(e, mcl, bytes(data)))
+
+
+def check_animation():
+    surface = gm.GIFSurface(127, 87, bg_color=0)
+    surface.set_palette('kwr')
+    anim = gm.Animation(surface)
+    maze = gm.Maze(61, 41, None).scale(2).translate((2, 2))
+    anim.pause(10)
+    anim.run(prim, maze, speed=30, delay=2, mcl=2, cmap={0: 0, 1: 1},
+             local_table=True, progress=False)
+    path = os.path.join(tempfile.mkdtemp(), 'fuzz.gif')
+    surface.save(path)
+    surface.close()
+
+    gif = decoder.read(path)
+    canvas = gif.canvas(-1)
+    white = bytearray([255, 255, 255])
+    for y in range(maze.height):
+        for x in range(maze.width):
+            i = 3 * ((2 * y + 2) * gif.width + 2 * x + 2)
+            assert (canvas[i: i + 3] == white) == maze.in_tree((x, y)), (x, y)
+    return len(gif.frames)
+
+
+if __name__ == '__main__':
+    cases = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    random.seed(0)
+    for _ in range(cases):
+        check_case()
+    print('{} random cases passed'.format(cases))
+    for _ in range(cases):
+        check_malformed()
+    print('{} malformed cases passed'.format(cases))
+    print('animation with {} frames passed'.format(check_animation()))
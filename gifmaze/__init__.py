@@ -13,4 +13,5 @@ from .maze import Maze
 from .surface import GIFSurface
 from .animation import Animation
 from . import algorithms
+from . import progress
 from .gentext import generate_text_mask
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+The coroutines of `gifmaze.server`. They are in a module of their own so
+that the version check of `gifmaze.server` runs before they are compiled.
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+
+logger = logging.getLogger('gifmaze.server')
+
+
+class ClientGone(Exception):
+    """Raised in the rendering thread when the client has disconnected."""
+
+
+class QueueWriter(object):
+    """
+    A file-like object that replaces the in-memory io of a `GIFSurface`,
+    the written data is put into an asyncio queue from the rendering thread.
+    """
+
+    def __init__(self, loop, queue):
+        self.loop = loop
+        self.queue = queue
+        self.closed = False
+
+    def write(self, data):
+        if self.closed:
+            raise ClientGone()
+        # block the rendering thread while the queue is full.
+        asyncio.run_coroutine_threadsafe(self.queue.put(bytes(data)), self.loop).result()
+
+    def getvalue(self):
+        return b''
+
+    def close(self):
+        pass
+
+
+def _chunk(data):
+    """Encode data as a chunk of the chunked transfer encoding."""
+    return ('%X\r\n' % len(data)).encode('ascii') + data + b'\r\n'
+
+
+class GIFServer(object):
+    """
+    The streaming server. `scenes` is a dict that maps url paths to scenes.
+    """
+
+    def __init__(self, scenes, max_renders=2, max_pending=16):
+        self.scenes = scenes
+        self.max_renders = max_renders
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_renders)
+        self._renders = None
+
+    async def start(self, host='127.0.0.1', port=8000):
+        """Start listening and return the `asyncio.Server` instance."""
+        self._renders = asyncio.Semaphore(self.max_renders)
+        return await asyncio.start_server(self._handle, host, port)
+
+    def run(self, host='127.0.0.1', port=8000):
+        """Run the server until it's interrupted."""
+        async def serve():
+            server = await self.start(host, port)
+            async with server:
+                await server.serve_forever()
+
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._executor.shutdown(wait=False)
+
+    async def _handle(self, reader, writer):
+        try:
+            request = await reader.readline()
+            # skip the request headers.
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+
+            parts = request.decode('latin-1').split()
+            if len(parts) < 2 or parts[0] != 'GET':
+                await self._error(writer, '405 Method Not Allowed')
+                return
+
+            scene = self.scenes.get(parts[1].split('?')[0])
+            if scene is None:
+                await self._error(writer, '404 Not Found')
+                return
+
+            async with self._renders:
+                await self._stream(scene, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _error(self, writer, status):
+        writer.write(('HTTP/1.1 %s\r\nContent-Length: 0\r\n'
+                      'Connection: close\r\n\r\n' % status).encode('ascii'))
+        await writer.drain()
+
+    async def _stream(self, scene, writer):
+        loop = asyncio.get_running_loop()
+        surface, animate = await loop.run_in_executor(self._executor, scene)
+
+        writer.write(b'HTTP/1.1 200 OK\r\n'
+                     b'Content-Type: image/gif\r\n'
+                     b'Transfer-Encoding: chunked\r\n'
+                     b'Cache-Control: no-cache\r\n'
+                     b'Connection: close\r\n\r\n')
+        queue = asyncio.Queue(maxsize=self.max_pending)
+        stream = QueueWriter(loop, queue)
+        # the header and whatever was drawn before the animation starts.
+        writer.write(_chunk(bytes(surface.stream_to(stream))))
+        loop.run_in_executor(self._executor, self._render, animate, surface, stream)
+
+        try:
+            await writer.drain()
+            while True:
+                data = await queue.get()
+                if data is None:
+                    break
+                writer.write(_chunk(data))
+                await writer.drain()
+
+            writer.write(_chunk(b'\x3B') + b'0\r\n\r\n')
+            await writer.drain()
+        except ConnectionError:
+            # let the rendering thread stop at its next write.
+            stream.closed = True
+            while await queue.get() is not None:
+                pass
+
+    def _render(self, animate, surface, stream):
+        """Run in a worker thread, put `None` into the queue when finished."""
+        try:
+            animate(surface)
+        except ClientGone:
+            pass
+        except Exception:
+            logger.exception('Rendering failed.')
+        finally:
+            asyncio.run_coroutine_threadsafe(stream.queue.put(None), stream.loop).result()
@@ -5,3 +5,7 @@ from .kruskal import kruskal
 from .dfs import dfs
 from .bfs import bfs
 from .astar import astar
+from .eller import eller
+from .binary_tree import binary_tree
+from .sidewinder import sidewinder
+from .tiled import tiled_spanning_tree
@@ -1,50 +1,63 @@
 # -*- coding: utf-8 -*-
 
 import heapq
-import random
+from array import array
 from gifmaze.maze import Maze
+from gifmaze.rng import RandomSource
+from gifmaze.progress import progress_bar
 
 
-def astar(maze, render, speed=20, start=(0, 0), end=(0, 0)):
-    """Solve a maze by A* search."""
-    weighted_edges = {(u, v): random.random() for u in maze.cells \
-                      for v in maze.get_neighbors(u)}
+def astar(maze, render, speed=20, start=(0, 0), end=(0, 0), seed=None):
+    """
+    Solve a maze by A* search.
+    The edges are weighted by random numbers, the weight of an edge is
+    drawn when it's first relaxed so no table of weights is kept.
+
+    seed: seed of the random numbers, see `gifmaze.rng.RandomSource`.
+    """
+    rand = RandomSource(seed).random
+    bar = progress_bar(render, total=len(maze.cells) - 1, desc="Solving maze by A*")
     queue = [(0, start)]
-    came_from = {start: start}
-    cost_so_far = {start: 0}
+    tree = maze.search_tree()  # the reached cells and their parents.
+    tree.add(start)
+    cols = (maze.width + 1) // 2
+    # `cost_so_far[i]` is the cost of the i-th cell, valid if it's in `tree`.
+    cost_so_far = array('d', [0.0]) * (cols * ((maze.height + 1) // 2))
+    count = 0  # cells visited since the last update of the bar
 
     def manhattan(u, v):
         """The heuristic distance between two cells."""
         return abs(u[0] - v[0]) + abs(u[1] - v[1])
 
+    def index(cell):
+        return (cell[1] >> 1) * cols + (cell[0] >> 1)
+
     while len(queue) > 0:
         _, child = heapq.heappop(queue)
-        parent = came_from[child]
+        parent = tree.parent(child)
         maze.mark_cell(child, Maze.FILL)
         maze.mark_space(parent, child, Maze.FILL)
+        count += 1
         if child == end:
             break
 
         for next_cell in maze.get_neighbors(child):
-            new_cost = cost_so_far[parent] + weighted_edges[(child, next_cell)]
-            if (next_cell not in cost_so_far or new_cost < cost_so_far[next_cell]) \
+            new_cost = cost_so_far[index(parent)] + rand()
+            if (next_cell not in tree or new_cost < cost_so_far[index(next_cell)]) \
                and (not maze.barrier(next_cell, child)):
-                cost_so_far[next_cell] = new_cost
-                came_from[next_cell] = child
+                cost_so_far[index(next_cell)] = new_cost
+                tree.add(next_cell, child)
                 priority = new_cost + manhattan(next_cell, end)
                 heapq.heappush(queue, (priority, next_cell))
 
         if maze.num_changes >= speed:
+            bar.update(count)
+            count = 0
             yield render(maze)
 
     if maze.num_changes > 0:
         yield render(maze)
+    bar.update(count)
 
-    path = [end]
-    v = end
-    while v != start:
-        v = came_from[v]
-        path.append(v)
-
-    maze.mark_path(path, Maze.PATH)
+    maze.mark_path(tree.path(end), Maze.PATH)
     yield render(maze)
@@ -1,50 +1,116 @@
 # -*- coding: utf-8 -*-
 
 from collections import deque
-from tqdm import tqdm
 from gifmaze.maze import Maze
+from gifmaze.progress import progress_bar
 
 
-def bfs(maze, render, speed=20, start=(0, 0), end=(80, 60)):
+def bfs(maze, render, speed=20, start=(0, 0), end=(80, 60), index=None, graph=None):
     """
     Solve a maze by breadth first search.
     The cells are marked by their distance to the starting cell plus three.
     This is because we must distinguish a 'flooded' cell from walls and tree.
+
+    index: `None` or a `gifmaze.distance.DistanceIndex` of this maze whose
+        root is `start`, the flood is then replayed from the index instead
+        of searching the maze again.
+
+    graph: `None` or a `gifmaze.junction.JunctionGraph` of this maze with
+        `start` and `end` as nodes. The graph is then searched by Dijkstra's
+        algorithm and each corridor is flooded when its far end is reached
+        (in a maze with loops, the corridors that are not on a shortest
+        path from `start` are not flooded).
     """
-    bar = tqdm(total=len(maze.cells) - 1, desc="Solving maze by bfs")
+    bar = progress_bar(render, total=len(maze.cells) - 1, desc="Solving maze by bfs")
     init_dist = 3
-    came_from = {start: start}
+    if index is not None:
+        if index.root != start:
+            raise ValueError('The root of the index must be the starting cell.')
+        for x in _replay(maze, render, bar, index, speed, init_dist, end):
+            yield x
+        return
+    if graph is not None:
+        for x in _junction_flood(maze, render, bar, graph, speed, init_dist, start, end):
+            yield x
+        return
+
+    tree = maze.search_tree()  # the visited cells and their parents.
+    tree.add(start)
     queue = deque([(start, init_dist)])
     maze.mark_cell(start, init_dist)
-    visited = set([start])
+    count = 0  # cells visited since the last update of the bar
 
     while len(queue) > 0:
         child, dist = queue.popleft()
-        parent = came_from[child]
+        parent = tree.parent(child)
         maze.mark_cell(child, dist)
         maze.mark_space(parent, child, dist)
-        bar.update(1)
+        if child != start:
+            count += 1
 
         for next_cell in maze.get_neighbors(child):
-            if (next_cell not in visited) and (not maze.barrier(child, next_cell)):
-                came_from[next_cell] = child
+            if (next_cell not in tree) and (not maze.barrier(child, next_cell)):
+                tree.add(next_cell, child)
                 queue.append((next_cell, dist + 1))
-                visited.add(next_cell)
 
         if maze.num_changes >= speed:
+            bar.update(count)
+            count = 0
             yield render(maze)
 
     if maze.num_changes > 0:
         yield render(maze)
+    bar.update(count)
 
-    path = [end]
-    v = end
-    while v != start:
-        v = came_from[v]
-        path.append(v)
-
-    maze.mark_path(path, Maze.PATH)
+    maze.mark_path(tree.path(end), Maze.PATH)
     # show the path
     yield render(maze)
 
-    bar.close()
+
+def _replay(maze, render, bar, index, speed, init_dist, end):
+    """Replay the flood of `bfs` from a `DistanceIndex`."""
+    maze.mark_cell(index.root, init_dist)
+    count = 0
+    for cell, parent, depth in index.flood():
+        maze.mark_cell(cell, init_dist + depth)
+        maze.mark_space(parent, cell, init_dist + depth)
+        if depth > 0:
+            count += 1
+        if maze.num_changes >= speed:
+            bar.update(count)
+            count = 0
+            yield render(maze)
+
+    if maze.num_changes > 0:
+        yield render(maze)
+    bar.update(count)
+
+    maze.mark_path(index.path(end, index.root), Maze.PATH)
+    yield render(maze)
+
+
+def _junction_flood(maze, render, bar, graph, speed, init_dist, start, end):
+    """The flood of `bfs` on a `JunctionGraph`."""
+    maze.mark_cell(start, init_dist)
+    parents = {}
+    count = 0
+    for u, first, v, dist in graph.search(start, parents):
+        cells = graph.corridor(u, first)
+        dist += init_dist - len(cells)
+        for cell in cells:
+            dist += 1
+            maze.mark_cell(cell, dist)
+            maze.mark_space(u, cell, dist)
+            u = cell
+        count += len(cells)
+        if maze.num_changes >= speed:
+            bar.update(count)
+            count = 0
+            yield render(maze)
+
+    if maze.num_changes > 0:
+        yield render(maze)
+    bar.update(count)
+
+    maze.mark_path(graph.path(parents, end), Maze.PATH)
+    yield render(maze)
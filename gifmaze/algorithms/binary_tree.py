@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+from gifmaze.maze import Maze
+from gifmaze.progress import progress_bar
+from gifmaze.rng import RandomSource
+
+
+def binary_tree(maze, render, speed=1, bias=0.5, seed=None):
+    """
+    Maze by the binary tree algorithm.
+
+    Each cell carves a passage either to the north or to the west, so the
+    cells are independent and the maze is carved in bulk with NumPy: the
+    random choices of `speed` rows of cells are drawn at once and written
+    into the maze as one band of rows, then a frame is emitted. This is fast
+    enough for mazes of size 10001x10001 (use a maze with a `grid_file`
+    to hold such a grid). NumPy is required and masks are not supported.
+
+    bias: probability of carving to the north.
+
+    seed: seed of the random numbers, see `gifmaze.rng.RandomSource`.
+        The NumPy random generator is seeded from it.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError('The binary tree algorithm requires NumPy, '
+                          'install it by `pip install gifmaze[numpy]`.')
+
+    cols = (maze.width + 1) // 2
+    rows = (maze.height + 1) // 2
+    if len(maze.cells) != cols * rows:
+        raise ValueError('The binary tree algorithm does not support masks.')
+
+    bar = progress_bar(render, total=rows, desc="Running binary tree algorithm")
+    rng = np.random.default_rng(RandomSource(seed).getrandbits(64))
+
+    for r in range(0, rows, speed):
+        k = min(speed, rows - r)
+        north = rng.random((k, cols)) < bias
+        # the cells in the left column can only go north,
+        # the cells in the top row can only go west.
+        north[:, 0] = True
+        if r == 0:
+            north[0] = False
+
+        # the band holds the grid rows 2r-1, 2r, ..., the odd rows are
+        # the passages to the north and the even rows are the cells and
+        # the passages to the west.
+        band = np.full((2 * k, maze.width), Maze.WALL, dtype=np.uint8)
+        band[0::2, 0::2][north] = Maze.TREE
+        band[1::2, 0::2] = Maze.TREE
+        band[1::2, 1::2][~north[:, 1:]] = Maze.TREE
+        if r == 0:
+            maze.mark_rows(0, band[1:])
+        else:
+            maze.mark_rows(2 * r - 1, band)
+
+        bar.update(k)
+        yield render(maze)
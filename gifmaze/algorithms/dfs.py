@@ -1,39 +1,74 @@
 # -*- coding: utf-8 -*-
 
 from gifmaze.maze import Maze
+from gifmaze.progress import progress_bar
 
 
-def dfs(maze, render, speed=20, start=(0, 0), end=(80, 60)):
-    """Solve a maze by dfs."""
-    came_from = {start: start}  # a dict to remember each step.
+def dfs(maze, render, speed=20, start=(0, 0), end=(80, 60), graph=None):
+    """
+    Solve a maze by dfs.
+
+    graph: `None` or a `gifmaze.junction.JunctionGraph` of this maze with
+        `start` and `end` as nodes. The search then runs on the graph and
+        each corridor is filled when its far end is reached.
+    """
+    bar = progress_bar(render, total=len(maze.cells) - 1, desc="Solving maze by dfs")
+    if graph is not None:
+        for x in _junction_search(maze, render, bar, graph, speed, start, end):
+            yield x
+        return
+
+    tree = maze.search_tree()  # the visited cells and their parents.
+    tree.add(start)
     stack = [start]
     maze.mark_cell(start, Maze.FILL)
-    visited = set([start])
+    count = 0  # cells visited since the last update of the bar
 
     while len(stack) > 0:
         child = stack.pop()
         if child == end:
             break
-        parent = came_from[child]
+        parent = tree.parent(child)
         maze.mark_cell(child, Maze.FILL)
         maze.mark_space(parent, child, Maze.FILL)
+        count += 1
         for next_cell in maze.get_neighbors(child):
-            if (next_cell not in visited) and (not maze.barrier(child, next_cell)):
-                came_from[next_cell] = child
+            if (next_cell not in tree) and (not maze.barrier(child, next_cell)):
+                tree.add(next_cell, child)
                 stack.append(next_cell)
-                visited.add(next_cell)
 
         if maze.num_changes >= speed:
+            bar.update(count)
+            count = 0
             yield render(maze)
 
     if maze.num_changes > 0:
         yield render(maze)
+    bar.update(count)
+
+    maze.mark_path(tree.path(end), Maze.PATH)
+    yield render(maze)
+
 
-    path = [end]
-    v = end
-    while v != start:
-        v = came_from[v]
-        path.append(v)
+def _junction_search(maze, render, bar, graph, speed, start, end):
+    """The search of `dfs` on a `JunctionGraph`."""
+    maze.mark_cell(start, Maze.FILL)
+    parents = {}
+    count = 0
+    for u, first, v, _ in graph.search(start, parents, depth_first=True, end=end):
+        cells = graph.corridor(u, first)
+        if v == end:
+            cells.pop()
+        maze.mark_path([u] + cells, Maze.FILL)
+        count += len(cells)
+        if maze.num_changes >= speed:
+            bar.update(count)
+            count = 0
+            yield render(maze)
+
+    if maze.num_changes > 0:
+        yield render(maze)
+    bar.update(count)
 
-    maze.mark_path(path, Maze.PATH)
+    maze.mark_path(graph.path(parents, end), Maze.PATH)
     yield render(maze)
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+from gifmaze.rng import RandomSource
+from gifmaze.maze import Maze
+from gifmaze.progress import progress_bar
+
+
+def eller(maze, render, speed=1, join=0.5, down=0.5, seed=None):
+    """
+    Maze by Eller's algorithm.
+
+    The maze is built row by row and only the sets of the cells in the
+    current row are kept, so the memory used by the algorithm is
+    proportional to the width of the maze (use a maze with a `grid_file`
+    to bound the memory of the grid too). A frame is emitted as soon as
+    every `speed` rows are finished, so very tall mazes stream out band
+    by band. Masks are not supported.
+
+    join: probability of joining two adjacent cells in different sets.
+
+    down: probability of carving down from a cell (each set carves down
+        at least once).
+
+    seed: seed of the random numbers, see `gifmaze.rng.RandomSource`.
+    """
+    rng = RandomSource(seed)
+    rand = rng.random
+    cols = (maze.width + 1) // 2
+    rows = (maze.height + 1) // 2
+    if len(maze.cells) != cols * rows:
+        raise ValueError("Eller's algorithm does not support masks.")
+
+    bar = progress_bar(render, total=rows, desc="Running Eller's algorithm")
+    # `sets[i]` is the set of the i-th cell in current row,
+    # `members[s]` is the list of cells in current row that belong to set `s`.
+    sets = list(range(cols))
+    members = {i: [i] for i in range(cols)}
+    next_set = cols
+
+    for r in range(rows):
+        y = 2 * r
+        last = r == rows - 1
+        for i in range(cols):
+            maze.mark_cell((2 * i, y), Maze.TREE)
+
+        # randomly join adjacent cells in different sets,
+        # in the last row all of them must be joined.
+        for i in range(cols - 1):
+            a, b = sets[i], sets[i + 1]
+            if a != b and (last or rand() < join):
+                maze.mark_cell((2 * i + 1, y), Maze.TREE)
+                # merge the smaller set into the larger one.
+                if len(members[a]) < len(members[b]):
+                    a, b = b, a
+                for j in members[b]:
+                    sets[j] = a
+                members[a].extend(members.pop(b))
+
+        if not last:
+            # carve down at least once from each set, the cells in
+            # the next row that are not reached start new sets.
+            next_sets = [None] * cols
+            for s, cells in members.items():
+                carved = [i for i in cells if rand() < down]
+                if not carved:
+                    carved = [rng.choice(cells)]
+                for i in carved:
+                    maze.mark_cell((2 * i, y + 1), Maze.TREE)
+                    next_sets[i] = s
+
+            members = {}
+            for i in range(cols):
+                if next_sets[i] is None:
+                    next_sets[i] = next_set
+                    next_set += 1
+                members.setdefault(next_sets[i], []).append(i)
+            sets = next_sets
+
+        if (r + 1) % speed == 0:
+            bar.update(speed)
+            yield render(maze)
+
+    if maze.num_changes > 0:
+        yield render(maze)
+    bar.update(rows % speed)
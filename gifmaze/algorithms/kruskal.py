@@ -1,51 +1,72 @@
 # -*- coding: utf-8 -*-
 
-import random
-from operator import itemgetter
-from tqdm import tqdm
+from array import array
+from gifmaze.rng import RandomSource
 from gifmaze.maze import Maze
+from gifmaze.progress import progress_bar
 
 
-def kruskal(maze, render, speed=30):
-    """Maze by Kruskal's algorithm."""
-    bar = tqdm(total=len(maze.cells) - 1, desc="Running Kruskal's algorithm")
-    parent = {v: v for v in maze.cells}
-    rank = {v: 0 for v in maze.cells}
-    edges = [(random.random(), u, v) for u in maze.cells \
-             for v in maze.get_neighbors(u) if u < v]
+def kruskal(maze, render, speed=30, seed=None):
+    """
+    Maze by Kruskal's algorithm.
+
+    The cells are identified by `(y // 2) * cols + x // 2` where `cols` is
+    the number of cells in a row, and the edge from a cell to its right
+    (resp. lower) neighbor by twice (resp. twice plus one) the id of the
+    cell. The union-find forest and the shuffled edges are arrays indexed
+    by these ids, about 13 bytes per cell. Unlike the other generators,
+    this is still proportional to the size of the whole maze for a maze
+    with a `grid_file`.
+
+    seed: seed of the random numbers, see `gifmaze.rng.RandomSource`.
+    """
+    rng = RandomSource(seed)
+    bar = progress_bar(render, total=len(maze.cells) - 1, desc="Running Kruskal's algorithm")
+    cols = (maze.width + 1) // 2
+    ncells = cols * ((maze.height + 1) // 2)
+    parent = array('i', range(ncells))
+    rank = array('B', [0]) * ncells
+    edges = array('I', (2 * ((u[1] >> 1) * cols + (u[0] >> 1)) + (v[1] > u[1])
+                        for u in maze.cells for v in maze.get_neighbors(u) if u < v))
+    rng.shuffle(edges)
+    count = 0  # edges added since the last update of the bar
 
     def find(v):
         """find the root of the subtree that v belongs to."""
         while parent[v] != v:
+            # path halving
+            parent[v] = parent[parent[v]]
             v = parent[v]
         return v
 
-    def union(u, v):
-        root1 = find(u)
-        root2 = find(v)
-
-        if root1 != root2:
-            if rank[root1] > rank[root2]:
-                parent[root2] = root1
-
-            elif rank[root1] < rank[root2]:
-                parent[root1] = root2
+    for e in edges:
+        i, south = divmod(e, 2)
+        root1 = find(i)
+        root2 = find(i + cols if south else i + 1)
+        if root1 == root2:
+            continue
 
-            else:
-                parent[root1] = root2
-                rank[root2] += 1
+        if rank[root1] > rank[root2]:
+            parent[root2] = root1
+        elif rank[root1] < rank[root2]:
+            parent[root1] = root2
+        else:
+            parent[root1] = root2
+            rank[root2] += 1
 
-    for _, u, v in sorted(edges, key=itemgetter(0)):
-        if find(u) != find(v):
-            union(u, v)
-            maze.mark_cell(u, Maze.TREE)
-            maze.mark_cell(v, Maze.TREE)
-            maze.mark_space(u, v, Maze.TREE)
-            bar.update(1)
-            if maze.num_changes >= speed:
-                yield render(maze)
+        y, x = divmod(i, cols)
+        u = (2 * x, 2 * y)
+        v = (u[0], u[1] + 2) if south else (u[0] + 2, u[1])
+        maze.mark_cell(u, Maze.TREE)
+        maze.mark_cell(v, Maze.TREE)
+        maze.mark_space(u, v, Maze.TREE)
+        count += 1
+        if maze.num_changes >= speed:
+            bar.update(count)
+            count = 0
+            yield render(maze)
 
     if maze.num_changes > 0:
         yield render(maze)
 
-    bar.close()
+    bar.update(count)
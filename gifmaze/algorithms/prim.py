@@ -1,36 +1,118 @@
 # -*- coding: utf-8 -*-
 
-import heapq
-import random
-from tqdm import tqdm
+from gifmaze.rng import RandomSource
 from gifmaze.maze import Maze
+from gifmaze.progress import progress_bar
 
 
-def prim(maze, render, speed=30, start=(0, 0)):
-    """Maze by Prim's algorithm."""
-    bar = tqdm(total=len(maze.cells) - 1, desc="Running Prim's algorithm")
+def prim(maze, render, speed=30, start=(0, 0), seed=None):
+    """
+    Maze by Prim's algorithm.
 
-    queue = [(random.random(), start, v) for v in maze.get_neighbors(start)]
-    maze.mark_cell(start, Maze.TREE)
+    The edges get random weights. The frontier (the cells adjacent to the
+    tree) is kept in an indexed heap keyed by the lightest edge from each
+    cell to the tree, this key is decreased when a lighter edge is found,
+    so the heap never holds more than the frontier.
+
+    seed: seed of the random numbers, see `gifmaze.rng.RandomSource`.
+    """
+    rand = RandomSource(seed).random
+    bar = progress_bar(render, total=len(maze.cells) - 1, desc="Running Prim's algorithm")
 
-    while len(queue) > 0:
-        _, parent, child = heapq.heappop(queue)
-        if maze.in_tree(child):
-            continue
+    frontier = _Frontier()
+    maze.mark_cell(start, Maze.TREE)
+    for v in maze.get_neighbors(start):
+        frontier.push(v, rand(), start)
+    count = 0  # cells added since the last update of the bar
 
+    while len(frontier) > 0:
+        child, parent = frontier.pop()
         maze.mark_cell(child, Maze.TREE)
         maze.mark_space(parent, child, Maze.TREE)
-        bar.update(1)
+        count += 1
 
         for v in maze.get_neighbors(child):
             # assign a weight to this edge only when it's needed.
-            weight = random.random()
-            heapq.heappush(queue, (weight, child, v))
+            if not maze.in_tree(v):
+                frontier.push(v, rand(), child)
 
         if maze.num_changes >= speed:
+            bar.update(count)
+            count = 0
             yield render(maze)
 
     if maze.num_changes > 0:
         yield render(maze)
 
-    bar.close()
+    bar.update(count)
+
+
+class _Frontier(object):
+    """
+    An indexed binary min-heap of cells. Each cell is in the heap at most
+    once with its key and the tree cell (its parent) that gives this key.
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._cells = []
+        self._pos = {}  # the index of each cell in the heap
+        self._parent = {}
+
+    def __len__(self):
+        return len(self._cells)
+
+    def push(self, cell, key, parent):
+        """Insert `cell`, or decrease its key if it's in the heap with a larger key."""
+        keys, cells, pos = self._keys, self._cells, self._pos
+        i = pos.get(cell)
+        if i is None:
+            i = len(cells)
+            keys.append(key)
+            cells.append(cell)
+        elif key < keys[i]:
+            keys[i] = key
+        else:
+            return
+        self._parent[cell] = parent
+
+        # sift up
+        while i > 0:
+            j = (i - 1) >> 1
+            if keys[j] <= key:
+                break
+            keys[i] = keys[j]
+            cells[i] = cells[j]
+            pos[cells[i]] = i
+            i = j
+        keys[i] = key
+        cells[i] = cell
+        pos[cell] = i
+
+    def pop(self):
+        """Remove the cell with the smallest key, return it and its parent."""
+        keys, cells, pos = self._keys, self._cells, self._pos
+        top = cells[0]
+        del pos[top]
+        key = keys.pop()
+        cell = cells.pop()
+        n = len(cells)
+        if n > 0:
+            # sift down the last cell from the root
+            i = 0
+            while True:
+                j = 2 * i + 1
+                if j >= n:
+                    break
+                if j + 1 < n and keys[j + 1] < keys[j]:
+                    j += 1
+                if key <= keys[j]:
+                    break
+                keys[i] = keys[j]
+                cells[i] = cells[j]
+                pos[cells[i]] = i
+                i = j
+            keys[i] = key
+            cells[i] = cell
+            pos[cell] = i
+        return top, self._parent.pop(top)
@@ -1,15 +1,21 @@
 # -*- coding: utf-8 -*-
 
-import random
-from tqdm import tqdm
+from gifmaze.rng import RandomSource
 from gifmaze.maze import Maze
+from gifmaze.progress import progress_bar
 
 
-def random_dfs(maze, render, speed=10, start=(0, 0)):
-    """Maze by random depth-first search."""
-    bar = tqdm(total=len(maze.cells) - 1, desc="Running random depth first search")
+def random_dfs(maze, render, speed=10, start=(0, 0), seed=None):
+    """
+    Maze by random depth-first search.
+
+    seed: seed of the random numbers, see `gifmaze.rng.RandomSource`.
+    """
+    shuffle = RandomSource(seed).shuffle
+    bar = progress_bar(render, total=len(maze.cells) - 1, desc="Running random depth first search")
     stack = [(start, v) for v in maze.get_neighbors(start)]
     maze.mark_cell(start, Maze.TREE)
+    count = 0  # cells added since the last update of the bar
 
     while len(stack) > 0:
         parent, child = stack.pop()
@@ -18,17 +24,19 @@ def random_dfs(maze, render, speed=10, start=(0, 0)):
 
         maze.mark_cell(child, Maze.TREE)
         maze.mark_space(parent, child, Maze.TREE)
-        bar.update(1)
+        count += 1
 
         neighbors = maze.get_neighbors(child)
-        random.shuffle(neighbors)
+        shuffle(neighbors)
         for v in neighbors:
             stack.append((child, v))
 
         if maze.num_changes >= speed:
+            bar.update(count)
+            count = 0
             yield render(maze)
 
     if maze.num_changes > 0:
         yield render(maze)
 
-    bar.close()
+    bar.update(count)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+from gifmaze.maze import Maze
+from gifmaze.progress import progress_bar
+from gifmaze.rng import RandomSource
+
+
+def sidewinder(maze, render, speed=1, bias=0.5, seed=None):
+    """
+    Maze by the sidewinder algorithm.
+
+    Each row of cells is split into runs of cells joined to the east, and
+    one random cell of each run carves a passage to the north. The runs
+    only depend on their own row, so the maze is carved in bulk with NumPy
+    in bands of `speed` rows of cells and a frame is emitted after each
+    band. This is fast enough for mazes of size 10001x10001 (use a maze
+    with a `grid_file` to hold such a grid). NumPy is required and masks
+    are not supported.
+
+    bias: probability of extending a run to the east.
+
+    seed: seed of the random numbers, see `gifmaze.rng.RandomSource`.
+        The NumPy random generator is seeded from it.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError('The sidewinder algorithm requires NumPy, '
+                          'install it by `pip install gifmaze[numpy]`.')
+
+    cols = (maze.width + 1) // 2
+    rows = (maze.height + 1) // 2
+    if len(maze.cells) != cols * rows:
+        raise ValueError('The sidewinder algorithm does not support masks.')
+
+    bar = progress_bar(render, total=rows, desc="Running sidewinder algorithm")
+    rng = np.random.default_rng(RandomSource(seed).getrandbits(64))
+
+    for r in range(0, rows, speed):
+        k = min(speed, rows - r)
+        east = rng.random((k, cols)) < bias
+        east[:, -1] = False
+        if r == 0:
+            # the top row is a single run.
+            east[0, :-1] = True
+
+        # the runs start at the left column and after each cell that does
+        # not go east, pick one random cell from each run to go north.
+        start = np.ones((k, cols), dtype=bool)
+        start[:, 1:] = ~east[:, :-1]
+        starts = np.flatnonzero(start)
+        lengths = np.diff(np.append(starts, k * cols))
+        picks = starts + (rng.random(len(starts)) * lengths).astype(np.intp)
+        north = np.zeros(k * cols, dtype=bool)
+        north[picks] = True
+        north = north.reshape(k, cols)
+        if r == 0:
+            north[0] = False
+
+        # the band holds the grid rows 2r-1, 2r, ..., see `binary_tree`.
+        band = np.full((2 * k, maze.width), Maze.WALL, dtype=np.uint8)
+        band[0::2, 0::2][north] = Maze.TREE
+        band[1::2, 0::2] = Maze.TREE
+        band[1::2, 1::2][east[:, :-1]] = Maze.TREE
+        if r == 0:
+            maze.mark_rows(0, band[1:])
+        else:
+            maze.mark_rows(2 * r - 1, band)
+
+        bar.update(k)
+        yield render(maze)
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+import random
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from gifmaze.maze import Maze
+from gifmaze.progress import progress_bar
+from gifmaze.rng import RandomSource
+
+
+def tiled_spanning_tree(maze, render, tile=32, workers=None, uniform=False,
+                        speed=1, seed=None):
+    """
+    Maze by building spanning trees of square tiles in parallel.
+
+    The maze is split into tiles of `tile`x`tile` cells, the spanning tree
+    (a spanning forest if a mask cuts a tile) of each tile is built in a
+    process pool, and the tiles are revealed in the animation as soon as
+    they are finished. Then the trees are joined by a spanning tree over
+    the edges that cross the tile boundaries, so the result is still a
+    perfect maze.
+
+    tile: size of the tiles in cells.
+
+    workers: number of worker processes, `None` means the number of CPUs,
+        0 or 1 builds the tiles in this process.
+
+    uniform: if `False` the tiles and the seams are built by Kruskal's
+        algorithm. If `True` the tiles are built by Wilson's algorithm
+        and the tiles are joined by Wilson's algorithm on the graph whose
+        vertices are the trees of the tiles and whose edges are the
+        boundary edges, so each tile is a uniform spanning tree of itself
+        and the seams are a uniform spanning tree of the tiles (the whole
+        maze is not exactly uniform).
+
+    speed: number of finished tiles between two frames.
+
+    seed: seed of the random numbers, the same seed gives the same maze
+        for any number of workers.
+    """
+    bar = progress_bar(render, total=len(maze.cells), desc="Running tiled spanning tree")
+    if seed is None:
+        seed = random.getrandbits(64)
+
+    size = 2 * tile
+    cols = (maze.width + 1) // 2
+    rows = (maze.height + 1) // 2
+    buckets = None
+    if len(maze.cells) != cols * rows:
+        # a masked maze, send the cells of each tile to the workers.
+        buckets = defaultdict(list)
+        for x, y in maze.cells:
+            buckets[(x // size, y // size)].append((x, y))
+
+    tasks = []
+    for y0 in range(0, maze.height, size):
+        for x0 in range(0, maze.width, size):
+            cells = None
+            if buckets is not None:
+                cells = buckets.pop((x0 // size, y0 // size), None)
+                if cells is None:
+                    continue
+            x1 = min(x0 + size, maze.width + 1) - 2
+            y1 = min(y0 + size, maze.height + 1) - 2
+            tasks.append((x0, y0, x1, y1, cells, uniform, '%s-%d' % (seed, len(tasks))))
+
+    if workers is not None and workers <= 1:
+        results = map(_tile_tree, tasks)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(workers)
+        results = (future.result() for future in
+                   as_completed([pool.submit(_tile_tree, task) for task in tasks]))
+
+    # `reps[cell]` is the root of the tree that contains `cell`,
+    # only the cells on the boundaries of the tiles are kept.
+    reps = {}
+    borders = []
+    try:
+        for i, (task, passages, boundary) in enumerate(results):
+            x0, y0, x1, y1, cells = task[:5]
+            for cell in (cells or _rectangle(x0, y0, x1, y1)):
+                maze.mark_cell(cell, Maze.TREE)
+            for cell in passages:
+                maze.mark_cell(cell, Maze.TREE)
+            reps.update(boundary)
+            borders.append((x1, y1, boundary))
+            bar.update(len(cells) if cells else ((x1 - x0) // 2 + 1) * ((y1 - y0) // 2 + 1))
+            if (i + 1) % speed == 0:
+                yield render(maze)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    # the edges that go right or down across a tile boundary.
+    seams = []
+    for x1, y1, boundary in borders:
+        for u in boundary:
+            if u[0] == x1 or u[1] == y1:
+                for v in maze.get_neighbors(u):
+                    if v[0] > x1 or v[1] > y1:
+                        seams.append((u, v))
+    seams.sort()
+
+    rng = RandomSource('%s-seams' % seed)
+    join = _join_uniform if uniform else _join_kruskal
+    for u, v in join(seams, reps, rng):
+        maze.mark_space(u, v, Maze.TREE)
+
+    if maze.num_changes > 0:
+        yield render(maze)
+
+
+def _rectangle(x0, y0, x1, y1):
+    """The cells of an unmasked tile."""
+    return [(x, y) for y in range(y0, y1 + 1, 2) for x in range(x0, x1 + 1, 2)]
+
+
+def _tile_tree(task):
+    """
+    Build the spanning forest of a tile, this runs in the worker processes.
+    Return the task, the list of the spaces between the cells that are
+    joined, and a dict that maps the cells on the boundary of the tile to
+    the roots of their trees.
+    """
+    x0, y0, x1, y1, cells, uniform, seed = task
+    rng = RandomSource(seed)
+    if cells is None:
+        cells = _rectangle(x0, y0, x1, y1)
+    members = set(cells)
+
+    def neighbors(cell):
+        x, y = cell
+        return [v for v in ((x - 2, y), (x, y - 2), (x + 2, y), (x, y + 2)) if v in members]
+
+    # the root of the tree of each cell.
+    root = {}
+    for cell in cells:
+        if cell not in root:
+            root[cell] = cell
+            stack = [cell]
+            while stack:
+                for v in neighbors(stack.pop()):
+                    if v not in root:
+                        root[v] = cell
+                        stack.append(v)
+
+    passages = []
+    if uniform:
+        # Wilson's algorithm, the walks are recorded by the
+        # last exit from each cell so the loops are erased implicitly.
+        in_tree = set(root.values())
+        exit_to = {}
+        for cell in cells:
+            u = cell
+            while u not in in_tree:
+                exit_to[u] = rng.choice(neighbors(u))
+                u = exit_to[u]
+            u = cell
+            while u not in in_tree:
+                in_tree.add(u)
+                v = exit_to[u]
+                passages.append(((u[0] + v[0]) // 2, (u[1] + v[1]) // 2))
+                u = v
+    else:
+        edges = [(u, v) for u in cells for v in neighbors(u) if u < v]
+        rng.shuffle(edges)
+        parent = {}
+        for u, v in edges:
+            ru, rv = _find(parent, u), _find(parent, v)
+            if ru != rv:
+                parent[ru] = rv
+                passages.append(((u[0] + v[0]) // 2, (u[1] + v[1]) // 2))
+
+    boundary = {(x, y): root[(x, y)] for x, y in cells
+                if x in (x0, x1) or y in (y0, y1)}
+    return task, passages, boundary
+
+
+def _find(parent, v):
+    """Find the root of `v` in a union-find forest with path halving."""
+    while v in parent:
+        if parent[v] in parent:
+            parent[v] = parent[parent[v]]
+        v = parent[v]
+    return v
+
+
+def _join_kruskal(seams, reps, rng):
+    """Join the trees of the tiles by Kruskal's algorithm on the seams."""
+    seams = seams[:]
+    rng.shuffle(seams)
+    parent = {}
+    for u, v in seams:
+        ru, rv = _find(parent, reps[u]), _find(parent, reps[v])
+        if ru != rv:
+            parent[ru] = rv
+            yield u, v
+
+
+def _join_uniform(seams, reps, rng):
+    """
+    Join the trees of the tiles by Wilson's algorithm on the multigraph
+    of the trees, each seam edge is an edge of this graph.
+    """
+    graph = defaultdict(list)
+    for u, v in seams:
+        graph[reps[u]].append((reps[v], u, v))
+        graph[reps[v]].append((reps[u], u, v))
+    if not graph:
+        return
+
+    trees = sorted(graph)
+    in_tree = {trees[0]}
+    exit_to = {}
+    for tree in trees:
+        t = tree
+        while t not in in_tree:
+            exit_to[t] = rng.choice(graph[t])
+            t = exit_to[t][0]
+        t = tree
+        while t not in in_tree:
+            in_tree.add(t)
+            t, u, v = exit_to[t]
+            yield u, v
@@ -1,13 +1,18 @@
 # -*- coding: utf-8 -*-
 
-import random
-from tqdm import tqdm
+from gifmaze.rng import RandomSource
 from gifmaze.maze import Maze
+from gifmaze.progress import progress_bar
 
 
-def wilson(maze, render, speed=50, root=(0, 0)):
-    """Maze by Wilson's uniform spanning tree algorithm."""
-    bar = tqdm(total=len(maze.cells) - 1, desc="Running Wilson's algorithm")
+def wilson(maze, render, speed=50, root=(0, 0), seed=None):
+    """
+    Maze by Wilson's uniform spanning tree algorithm.
+
+    seed: seed of the random numbers, see `gifmaze.rng.RandomSource`.
+    """
+    rand = RandomSource(seed).random
+    bar = progress_bar(render, total=len(maze.cells) - 1, desc="Running Wilson's algorithm")
 
     def add_to_path(path, cell):
         """
@@ -31,6 +36,7 @@ def wilson(maze, render, speed=50, root=(0, 0)):
 
     # initially the tree contains only the root.
     maze.mark_cell(root, Maze.TREE)
+    count = 0  # cells added since the last update of the bar
 
     # for each cell that is not in the tree,
     # start a loop erased random walk from this cell until the walk hits the tree.
@@ -42,7 +48,8 @@ def wilson(maze, render, speed=50, root=(0, 0)):
             current_cell = cell
 
             while not maze.in_tree(current_cell):
-                next_cell = random.choice(maze.get_neighbors(current_cell))
+                neighbors = maze.get_neighbors(current_cell)
+                next_cell = neighbors[int(rand() * len(neighbors))]
                 # if it's already in the path then a loop is found.
                 if maze.in_path(next_cell):
                     lerw = erase_loop(lerw, next_cell)
@@ -60,13 +67,15 @@ def wilson(maze, render, speed=50, root=(0, 0)):
                 current_cell = next_cell
 
                 if maze.num_changes >= speed:
+                    bar.update(count)
+                    count = 0
                     yield render(maze)
 
             # once the walk hits the tree then add its path to the tree.
             maze.mark_path(lerw, Maze.TREE)
-            bar.update(len(lerw) - 1)
+            count += len(lerw) - 1
 
     if maze.num_changes > 0:
         yield render(maze)
 
-    bar.close()
+    bar.update(count)
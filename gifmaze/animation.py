@@ -3,8 +3,10 @@
 `Animation` is the middle layer object that controls how
 a `Maze` object is rendered to a `GIFSurface` object.
 """
+import time
 from functools import partial
 from . import encoder
+from .progress import Progress, NullProgress, default_progress
 
 
 class Render(object):
@@ -12,25 +14,98 @@ class Render(object):
     This class encodes the region specified by the `frame_box` attribute of a maze
     into one frame in the GIF image.
     """
-    def __init__(self, cmap, mcl):
+    def __init__(self, cmap, mcl, palette=None, trans_index=None, coalesce=1,
+                 clear='eager', progress=None, scaling=None, translation=None,
+                 lossy=None):
         """
         cmap: a dict that maps the value of the cells to their color indices.
 
         mcl: the minimum code length for the LZW compression.
 
+        palette: the global color table of the surface. If it's not `None`
+            then each frame carries a local color table that contains only
+            the colors used in this frame, and the pixels are remapped into
+            this small table so they can be encoded with fewer bits.
+
+        trans_index: the transparent color index in the global color table.
+            When a frame has a local color table it's put at index 0 of
+            this table, use `control` to get the right graphics control block.
+
+        coalesce: number of successive calls that are merged into one frame.
+            The skipped calls return `None` and leave `frame_box` untouched,
+            so the merged frame covers the union of their dirty regions.
+
+        clear: the policy for clearing the LZW code table, see `lzw_compress`.
+
+        progress: an instance of `gifmaze.progress.Progress`, the algorithms
+            report the number of processed cells to it.
+
+        scaling, translation: if not `None` they are used instead of the
+            `scaling` and `translation` attributes of the maze.
+
+        lossy: `None` or the list returned by `encoder.similar_colors` for
+            the global color table, enables the lossy LZW compression.
+
         A default dict is initialized so that one can set the colormap by
         just specifying what needs to be specified.
         """
         self.colormap = {i: i for i in range(1 << mcl)}
         if cmap:
             self.colormap.update(cmap)
-        self.compress = partial(encoder.lzw_compress, mcl=mcl)
+        self.clear = clear
+        self.mcl = mcl
+        self.palette = palette
+        self.trans_index = trans_index
+        self._local = False  # whether the last frame has a local color table
+        self._transparent = False  # whether the last frame has transparent pixels
+        self.coalesce = coalesce
+        self._calls = 0   # number of calls since the last encoded frame
+        self._merged = 1  # number of calls merged into the last encoded frame
+        self.progress = progress if progress is not None else NullProgress()
+        self.scaling = scaling
+        self.translation = translation
+        self.lossy = lossy
 
     def __call__(self, maze):
         """
         Encode current maze into one frame and return the encoded data.
         Note the graphics control block is not added here.
+        Return `None` if this call is merged into a later frame.
+        """
+        self._calls += 1
+        if self._calls < self.coalesce:
+            maze.reset(frame_box=False)
+            return None
+
+        return self.encode(maze)
+
+    def flush(self, maze):
+        """
+        Encode the calls that are still waiting to be merged,
+        return `None` if there is nothing to encode.
+        """
+        if self._calls > 0 and maze.frame_box is not None:
+            return self.encode(maze)
+        self._calls = 0
+        return None
+
+    def encode(self, maze):
+        """
+        Encode current maze into one frame regardless of `coalesce`.
+        """
+        self._merged = max(self._calls, 1)
+        self._calls = 0
+        frame = self.draw(maze)
+        # clear `num_changes` and `frame_box`
+        maze.reset()
+        return frame
+
+    def draw(self, maze):
+        """
+        Encode the `frame_box` region of the maze, the maze is not reset.
         """
+        scaling = self.scaling or maze.scaling
+        translation = self.translation or maze.translation
         # the image descriptor
         if maze.frame_box is not None:
             left, top, right, bottom = maze.frame_box
@@ -39,22 +114,346 @@ class Render(object):
 
         width = right - left + 1
         height = bottom - top + 1
-        descriptor = encoder.image_descriptor(maze.scaling * left + maze.translation[0],
-                                              maze.scaling * top  + maze.translation[1],
-                                              maze.scaling * width,
-                                              maze.scaling * height)
-
-        pixels = [self.colormap[maze.get_cell((x // maze.scaling + left,
-                                               y // maze.scaling + top))] \
-                  for y in range(height * maze.scaling) \
-                  for x in range(width * maze.scaling)]
-
-        # the compressed image data of this frame
-        data = self.compress(pixels)
-        # clear `num_changes` and `frame_box`
-        maze.reset()
+        colormap = self.colormap
+        color_table, byte, mcl, lossy = bytearray(), 0, self.mcl, self.lossy
+        if self.palette is not None:
+            values = set()
+            for y in range(top, bottom + 1):
+                values.update(maze.get_row(y, left, right))
+            colors = set(colormap[v] for v in values)
+            local = self.local_color_table(colors, scaling * scaling * width * height)
+            if local is not None:
+                color_table, byte, indices, mcl, colors = local
+                colormap = {v: indices[colormap[v]] for v in values}
+                if lossy is not None:
+                    lossy = _local_similar(lossy, colors)
+        self._local = bool(byte)
+
+        descriptor = encoder.image_descriptor(scaling * left + translation[0],
+                                              scaling * top  + translation[1],
+                                              scaling * width,
+                                              scaling * height,
+                                              byte)
+
+        # the compressed image data of this frame, the rows are encoded
+        # as they are produced so only one row is held in memory.
+        lzw = encoder.LZWEncoder(mcl, self.clear, lossy)
+        data = bytearray()
+        trans = self._frame_trans_index()
+        self._transparent = False
+        for y in range(top, bottom + 1):
+            row = [colormap[v] for v in maze.get_row(y, left, right)]
+            if trans is not None and not self._transparent:
+                self._transparent = trans in row
+            if scaling > 1:
+                row = [c for c in row for _ in range(scaling)]
+            for _ in range(scaling):
+                data += lzw.feed(row)
+        data += lzw.finish()
+        return descriptor + color_table + data
+
+    def encode_pixels(self, left, top, rows):
+        """
+        Encode a list of rows of pixels (color indices in the global color
+        table) into one frame placed at `(left, top)` of the surface. The
+        colormap, scaling and translation are not applied.
+        """
+        color_table, byte, mcl, lossy = bytearray(), 0, self.mcl, self.lossy
+        indices = None
+        if self.palette is not None:
+            colors = set()
+            for row in rows:
+                colors.update(row)
+            local = self.local_color_table(colors, len(rows) * len(rows[0]))
+            if local is not None:
+                color_table, byte, indices, mcl, colors = local
+                if lossy is not None:
+                    lossy = _local_similar(lossy, colors)
+        self._local = bool(byte)
+
+        descriptor = encoder.image_descriptor(left, top, len(rows[0]), len(rows), byte)
+        lzw = encoder.LZWEncoder(mcl, self.clear, lossy)
+        data = bytearray()
+        trans = self._frame_trans_index()
+        self._transparent = False
+        for row in rows:
+            if indices is not None:
+                row = [indices[c] for c in row]
+            if trans is not None and not self._transparent:
+                self._transparent = trans in row
+            data += lzw.feed(row)
+        data += lzw.finish()
+        return descriptor + color_table + data
+
+    def _frame_trans_index(self):
+        """The transparent color index in the color table of the last frame."""
+        if self._local and self.trans_index is not None:
+            return 0
+        return self.trans_index
+
+    def control(self, delay):
+        """
+        The graphics control block for the frame that was just encoded,
+        `delay` is the delay of one call and is multiplied by the number
+        of calls merged into this frame.
+        """
+        delay *= self._merged
+        if self._local and self.trans_index is not None:
+            return encoder.graphics_control_block(delay, 0)
+        return encoder.graphics_control_block(delay, self.trans_index)
+
+    def local_color_table(self, colors, npixels):
+        """
+        Build a local color table that holds only `colors` for a frame of
+        `npixels` pixels. Return the table, the flags byte for the image
+        descriptor, a dict that maps the colors to their indices in this
+        table, the minimum code length and the list of the colors of the
+        table (as indices in the global color table).
+
+        A local table costs `3 * 2**nbits` bytes while the shorter codes only
+        pay off before the LZW code table grows large, so `None` is returned
+        if the table is not guaranteed to be smaller than the bits it saves.
+        """
+        colors = sorted(colors)
+        if self.trans_index is not None:
+            if self.trans_index in colors:
+                colors.remove(self.trans_index)
+            colors.insert(0, self.trans_index)
+
+        nbits = max((len(colors) - 1).bit_length(), 1)
+        mcl = max(nbits, 2)
+        # a frame of n pixels is encoded with at least sqrt(2n) codes.
+        ncodes = int((2 * npixels) ** 0.5)
+        saved = _code_bits(self.mcl, ncodes) - _code_bits(mcl, ncodes)
+        if saved <= 8 * (3 << nbits):
+            return None
+
+        color_table = bytearray(3 << nbits)
+        indices = {}
+        for i, c in enumerate(colors):
+            rgb = self.palette[3 * c: 3 * c + 3]
+            color_table[3 * i: 3 * i + len(rgb)] = rgb
+            indices[c] = i
+
+        byte = 0b10000000 | (nbits - 1)
+        return color_table, byte, indices, mcl, colors
+
+
+class FanoutRender(Render):
+    """
+    This class encodes the same frames of a maze into several targets,
+    so the algorithm runs only once for all of them. Each target has its
+    own `Render` (with its own scaling, translation and colormap) and the
+    maze is reset only after all targets have been drawn.
+    Calling an instance returns a list of frames, one for each target.
+    """
+    def __init__(self, renders, coalesce=1, progress=None):
+        """
+        renders: a list of `Render` instances, one for each target.
+
+        coalesce, progress: see the doc for `Render`.
+        """
+        self.renders = renders
+        self.coalesce = coalesce
+        self._calls = 0
+        self._merged = 1
+        self.progress = progress if progress is not None else NullProgress()
+
+    def draw(self, maze):
+        return [render.draw(maze) for render in self.renders]
+
+    def controls(self, delay):
+        """The graphics control blocks for the frames that were just encoded."""
+        delay *= self._merged
+        return [render.control(delay) for render in self.renders]
+
+
+class RegionRender(Render):
+    """
+    This class is used by `Animation.run_many`. Encoding a frame is deferred:
+    calling an instance returns the maze and leaves its `frame_box` as it
+    is, so the animation can draw the regions of all runs of a round at once
+    (and composite the regions that touch each other) and reset the mazes.
+    """
+
+    def encode(self, maze):
+        self._merged = max(self._calls, 1)
+        self._calls = 0
+        return maze
+
+    def box(self, maze):
+        """The `frame_box` region of the maze in the pixels of the surface."""
+        scaling = self.scaling or maze.scaling
+        translation = self.translation or maze.translation
+        if maze.frame_box is not None:
+            left, top, right, bottom = maze.frame_box
+        else:
+            left, top, right, bottom = 0, 0, maze.width - 1, maze.height - 1
+        return (scaling * left + translation[0], scaling * top + translation[1],
+                scaling * (right + 1) + translation[0] - 1,
+                scaling * (bottom + 1) + translation[1] - 1)
+
+    def rows(self, maze):
+        """Iterate over the rows of pixels (global color indices) of the `frame_box` region."""
+        scaling = self.scaling or maze.scaling
+        if maze.frame_box is not None:
+            left, top, right, bottom = maze.frame_box
+        else:
+            left, top, right, bottom = 0, 0, maze.width - 1, maze.height - 1
+        colormap = self.colormap
+        for y in range(top, bottom + 1):
+            row = [colormap[v] for v in maze.get_row(y, left, right)]
+            if scaling > 1:
+                row = [c for c in row for _ in range(scaling)]
+            for _ in range(scaling):
+                yield row
+
+
+def _touch(box1, box2):
+    """Check if two regions `(left, top, right, bottom)` overlap or are adjacent."""
+    return (box1[0] <= box2[2] + 1 and box2[0] <= box1[2] + 1 and
+            box1[1] <= box2[3] + 1 and box2[1] <= box1[3] + 1)
+
+
+def _group_regions(regions):
+    """
+    Split a list of `(render, maze, box)` tuples into groups of regions that
+    are connected by touching each other, in the order of their first items.
+    """
+    groups = []
+    for region in regions:
+        touching = [g for g in groups if any(_touch(region[2], r[2]) for r in g)]
+        group = [region]
+        for g in touching:
+            group = g + group
+            groups.remove(g)
+        groups.append(group)
+    # keep the order of the runs.
+    return sorted(groups, key=lambda g: min(regions.index(r) for r in g))
 
-        return descriptor + data
+
+def _composite(group, fill, mcl):
+    """
+    Paint a group of touching regions onto a canvas that covers them, the
+    pixels outside the regions get the color index `fill`, or if it's `None`
+    a color index below `2**mcl` that's not used in the canvas (a
+    `ValueError` is raised if there is none). Return the position and the
+    rows of the canvas and the fill color.
+    """
+    left = min(box[0] for _, _, box in group)
+    top = min(box[1] for _, _, box in group)
+    right = max(box[2] for _, _, box in group)
+    bottom = max(box[3] for _, _, box in group)
+    canvas = [[-1] * (right - left + 1) for _ in range(bottom - top + 1)]
+    for render, maze, box in group:
+        for y, row in enumerate(render.rows(maze), box[1] - top):
+            canvas[y][box[0] - left: box[0] - left + len(row)] = row
+
+    if fill is None:
+        used = set()
+        for row in canvas:
+            used.update(row)
+        if -1 not in used:
+            return left, top, canvas, None
+        fill = next((c for c in range(1 << mcl) if c not in used), None)
+        if fill is None:
+            raise ValueError('All the colors are used in a frame, '
+                             'a `trans_index` is needed to composite the runs.')
+    canvas = [[fill if c < 0 else c for c in row] for row in canvas]
+    return left, top, canvas, fill
+
+
+class EstimateRender(Render):
+    """
+    This class is used for dry runs. It keeps track of the frames and their
+    sizes in pixels, but only every `sample`-th frame is actually encoded
+    (an empty frame is returned for the others), so the compressed size
+    and the encoding time of all frames can be extrapolated from them.
+    """
+
+    # bytes of a frame besides its compressed codes: the graphics control
+    # block, the image descriptor, the minimum code length and the terminator.
+    FRAME_OVERHEAD = 8 + 10 + 2
+
+    def __init__(self, cmap, mcl, palette=None, trans_index=None, coalesce=1,
+                 clear='eager', sample=10, lossy=None):
+        """
+        sample: encode one frame out of every `sample` frames.
+
+        The other parameters are the same as for `Render`, the progress
+        reporter counts the cells processed by the algorithm.
+        """
+        Render.__init__(self, cmap, mcl, palette, trans_index, coalesce, clear,
+                        Progress(interval=float('inf')), lossy=lossy)
+        self.sample = max(sample, 1)
+        self.frames = 0
+        self.pixels = 0
+        self.sampled_frames = 0
+        self.sampled_pixels = 0
+        self.sampled_bytes = 0
+        self.encode_time = 0.0
+
+    def draw(self, maze):
+        scaling = self.scaling or maze.scaling
+        if maze.frame_box is not None:
+            left, top, right, bottom = maze.frame_box
+        else:
+            left, top, right, bottom = 0, 0, maze.width - 1, maze.height - 1
+
+        npixels = scaling * scaling * (right - left + 1) * (bottom - top + 1)
+        self.frames += 1
+        self.pixels += npixels
+        if (self.frames - 1) % self.sample != 0:
+            return bytearray()
+
+        start = time.time()
+        frame = Render.draw(self, maze)
+        self.encode_time += time.time() - start
+        self.sampled_frames += 1
+        self.sampled_pixels += npixels
+        self.sampled_bytes += len(frame)
+        return frame
+
+    def estimate_bytes(self):
+        """The estimated number of bytes of all frames drawn so far."""
+        if self.sampled_pixels == 0:
+            return self.FRAME_OVERHEAD * self.frames
+        # the sampled frames include the image descriptors but not the
+        # graphics control blocks.
+        overhead = self.FRAME_OVERHEAD - 8
+        per_pixel = float(self.sampled_bytes - overhead * self.sampled_frames) / self.sampled_pixels
+        return self.FRAME_OVERHEAD * self.frames + per_pixel * self.pixels
+
+    def estimate_encode_time(self):
+        """The estimated time for encoding all frames drawn so far."""
+        if self.sampled_pixels == 0:
+            return 0.0
+        return self.encode_time * self.pixels / self.sampled_pixels
+
+
+def _local_similar(similar, colors):
+    """
+    Remap the similar colors of the global color table (see
+    `encoder.similar_colors`) to a local color table holding `colors`.
+    """
+    indices = {c: i for i, c in enumerate(colors)}
+    return [[indices[c2] for c2 in similar[c] if c2 in indices] for c in colors]
+
+
+def _code_bits(mcl, ncodes):
+    """
+    Total number of bits of the first `ncodes` codes output by `lzw_compress`
+    with minimum code length `mcl` (ignoring clear codes).
+    """
+    bits = 0
+    code_length = mcl + 1
+    next_code = (1 << mcl) + 2
+    for _ in range(ncodes):
+        bits += code_length
+        next_code += 1
+        if next_code == 2**code_length + 1:
+            code_length = min(code_length + 1, 12)
+    return bits
 
 
 class Animation(object):
@@ -75,7 +474,8 @@ class Animation(object):
         self._gif_surface.write(encoder.rectangle(*args))
 
     def run(self, algo, maze, delay=5, trans_index=None,
-            cmap=None, mcl=8, **kwargs):
+            cmap=None, mcl=8, local_table=False, min_delay=0,
+            clear='eager', progress=None, targets=None, lossy=0, **kwargs):
         """
         The entrance for running the animations.
 
@@ -96,8 +496,244 @@ class Animation(object):
             to their color indices.
 
         mcl: see the doc for the lzw_compress.
+
+        local_table: if `True` then each frame is encoded with a local
+            color table that holds only the colors it uses, so frames
+            that touch only a few colors of a large global color table
+            are encoded with short codes. The global color table of the
+            surface must be set before calling this method.
+
+        min_delay: browsers play frames with very short delays (below 2)
+            slower than requested, if `delay < min_delay` then successive
+            frames are merged until their total delay reaches `min_delay`,
+            this saves encoding time and file size.
+
+        clear: 'eager' or 'adaptive', the policy for clearing the LZW code
+            table. 'adaptive' usually gives smaller files for large frames.
+
+        progress: an instance of `gifmaze.progress.Progress` that receives the
+            number of processed cells, emitted frames and written bytes.
+            `None` means a tqdm bar if tqdm is installed, `False` means no
+            progress is reported.
+
+        targets: a list of `(surface, scale, translation, cmap)` tuples.
+            If it's given then the frames are written to each of these
+            surfaces (instead of the surface of this animation), with the
+            given scale and translation of the maze and colormap, while the
+            algorithm runs only once. `None` values of `scale`, `translation`
+            and `cmap` fall back to the maze's attributes and `cmap` above.
+
+        lossy: a tolerance for the distance between colors (as r, g, b
+            vectors). If it's positive then the LZW compression may encode
+            pixels with other colors within this distance to get smaller
+            files, this works well for gradient-colored animations.
+            The global color table of the surface must be set before
+            calling this method.
         """
-        render = Render(cmap, mcl)
-        control = encoder.graphics_control_block(delay, trans_index)
+        coalesce = max(-(-min_delay // delay), 1) if delay > 0 else 1
+        if progress is None:
+            progress = default_progress()
+        elif progress is False:
+            progress = NullProgress()
+
+        if targets is None:
+            palette = self._get_palette(self._gif_surface, local_table)
+            render = Render(cmap, mcl, palette, trans_index, coalesce, clear, progress,
+                            lossy=self._get_similar(self._gif_surface, lossy, mcl,
+                                                     trans_index))
+            write = partial(self._write_frame, self._gif_surface, render, delay)
+        else:
+            surfaces = []
+            renders = []
+            for surface, scale, translation, target_cmap in targets:
+                palette = self._get_palette(surface, local_table)
+                renders.append(Render(target_cmap or cmap, mcl, palette, trans_index,
+                                      clear=clear, scaling=scale, translation=translation,
+                                      lossy=self._get_similar(surface, lossy, mcl, trans_index)))
+                surfaces.append(surface)
+            render = FanoutRender(renders, coalesce, progress)
+            write = partial(self._write_frames, surfaces, render, delay)
+
         for frame in algo(maze, render, **kwargs):
-            self._gif_surface.write(control + frame)
+            if frame is not None:
+                write(frame)
+
+        frame = render.flush(maze)
+        if frame is not None:
+            write(frame)
+        progress.close()
+
+    def estimate(self, algo, maze, delay=5, trans_index=None, cmap=None, mcl=8,
+                 local_table=False, min_delay=0, clear='eager', lossy=0,
+                 sample=10, max_frames=None, **kwargs):
+        """
+        A dry run of `run`: the algorithm runs on the maze and the frames are
+        counted, but only every `sample`-th frame is encoded and nothing is
+        written to the surface. The maze is modified as by `run`, so run the
+        estimate on another maze of the same size.
+
+        sample: encode one frame out of every `sample` frames, the size and
+            the encoding time of the other frames are extrapolated from the
+            encoded ones in proportion to their numbers of pixels.
+
+        max_frames: if not `None` then only a prefix of the algorithm that
+            emits this many frames is run, and the numbers are extrapolated
+            by the fraction of the cells that the algorithm has processed.
+            This is only a rough estimate, since the frames of most
+            algorithms change their sizes and rates as the algorithm goes.
+
+        The other parameters are the same as in `run`.
+
+        Return a dict with the estimated number of 'frames', 'bytes' (of the
+        frames, without the header of the GIF file) and 'seconds' (of a real
+        run), the number of 'sampled_frames', and 'complete' which is `False`
+        if only a prefix of the algorithm was run.
+        """
+        coalesce = max(-(-min_delay // delay), 1) if delay > 0 else 1
+        palette = self._get_palette(self._gif_surface, local_table)
+        render = EstimateRender(cmap, mcl, palette, trans_index, coalesce, clear, sample,
+                                self._get_similar(self._gif_surface, lossy, mcl, trans_index))
+
+        start = time.time()
+        complete = True
+        generator = algo(maze, render, **kwargs)
+        for _ in generator:
+            if max_frames is not None and render.frames >= max_frames:
+                complete = False
+                generator.close()
+                break
+        else:
+            render.flush(maze)
+        algo_time = time.time() - start - render.encode_time
+
+        progress = render.progress
+        scale = 1.0
+        if not complete and progress.cells > 0 and progress.total:
+            scale = float(progress.total) / progress.cells
+
+        return {'frames': int(round(render.frames * scale)),
+                'bytes': int(round(render.estimate_bytes() * scale)),
+                'seconds': (algo_time + render.estimate_encode_time()) * scale,
+                'sampled_frames': render.sampled_frames,
+                'complete': complete}
+
+    def run_many(self, runs, delay=5, trans_index=None, cmap=None, mcl=8,
+                 local_table=False, min_delay=0, clear='eager', lossy=0, progress=None):
+        """
+        Run several algorithms at the same time on this surface, e.g. to
+        show them side by side (the mazes should be translated so that
+        they do not overlap).
+
+        runs: a list of `(algo, maze, kwargs)` tuples, `kwargs` is the dict
+            of the keyword arguments for `algo`.
+
+        progress: `None` means a tqdm bar for each run if tqdm is installed,
+            `False` means no progress is reported, otherwise a list of
+            reporters, one for each run.
+
+        The other parameters are the same as in `run` and apply to all runs.
+
+        The generators of the algorithms are advanced in rounds, one step each.
+        Each run's region changed in a round is written as an image of its
+        own, and only the last image of the round has a graphics control
+        block with the `delay` (the other images have one only if they have
+        transparent pixels), so the round is played as one frame. Regions
+        that overlap or are adjacent are composited into one image instead,
+        its pixels outside the regions are transparent: they have the color
+        `trans_index`, or if it's `None` a color index below `2**mcl` that
+        is not used in the image (a `ValueError` is raised if there is none).
+        A run that finishes early simply drops out of the rounds.
+        """
+        coalesce = max(-(-min_delay // delay), 1) if delay > 0 else 1
+        if progress is None:
+            progress = [default_progress() for _ in runs]
+        elif progress is False:
+            progress = [NullProgress() for _ in runs]
+
+        palette = self._get_palette(self._gif_surface, local_table)
+        similar = self._get_similar(self._gif_surface, lossy, mcl, trans_index)
+        # the similar colors for each transparent color of the composited images.
+        composite_similar = {trans_index: similar}
+        compositor = Render(None, mcl, palette, trans_index, clear=clear, lossy=similar)
+        active = []
+        for (algo, maze, kwargs), reporter in zip(runs, progress):
+            render = RegionRender(cmap, mcl, palette, trans_index, coalesce, clear, reporter,
+                                  lossy=similar)
+            active.append((algo(maze, render, **kwargs), render, maze))
+
+        while active:
+            regions = []
+            for run in list(active):
+                generator, render, maze = run
+                try:
+                    region = next(generator)
+                except StopIteration:
+                    active.remove(run)
+                    region = render.flush(maze)
+                    render.progress.close()
+                if region is not None:
+                    regions.append((render, maze, render.box(maze)))
+            if not regions:
+                continue
+
+            merged = max(render._merged for render, _, _ in regions)
+            groups = _group_regions(regions)
+            for i, group in enumerate(groups):
+                if len(group) == 1:
+                    writer, maze, _ = group[0]
+                    frame = writer.draw(maze)
+                else:
+                    writer = compositor
+                    left, top, canvas, fill = _composite(group, trans_index, mcl)
+                    writer.trans_index = fill
+                    if fill not in composite_similar:
+                        composite_similar[fill] = self._get_similar(self._gif_surface, lossy,
+                                                                    mcl, fill)
+                    writer.lossy = composite_similar[fill]
+                    frame = writer.encode_pixels(left, top, canvas)
+
+                if i == len(groups) - 1:
+                    writer._merged = merged
+                    frame = writer.control(delay) + frame
+                elif writer._transparent:
+                    frame = writer.control(0) + frame
+                self._gif_surface.write(frame)
+                for render, maze, _ in group:
+                    maze.reset()
+                    render.progress.frame(len(frame))
+
+    @staticmethod
+    def _get_palette(surface, local_table):
+        """The global color table of the surface if local color tables are used."""
+        if not local_table:
+            return None
+        if surface.palette is None:
+            raise ValueError('Missing global color table.')
+        return surface.palette
+
+    @staticmethod
+    def _get_similar(surface, lossy, mcl, trans_index=None):
+        """
+        The similar colors in the global color table of the surface for the
+        lossy mode, for all the color indices below `2**mcl`. The transparent
+        color `trans_index` has none and is similar to none.
+        """
+        if not lossy:
+            return None
+        if surface.palette is None:
+            raise ValueError('Missing global color table.')
+        return encoder.similar_colors(surface.palette, lossy, 1 << mcl, trans_index)
+
+    @staticmethod
+    def _write_frame(surface, render, delay, frame):
+        data = render.control(delay) + frame
+        surface.write(data)
+        render.progress.frame(len(data))
+
+    @staticmethod
+    def _write_frames(surfaces, render, delay, frames):
+        nbytes = 0
+        for surface, control, frame in zip(surfaces, render.controls(delay), frames):
+            surface.write(control + frame)
+            nbytes += len(control) + len(frame)
+        render.progress.frame(nbytes)
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+~~~~~~~~~~~~~~~~~~~~
+A simple GIF decoder
+~~~~~~~~~~~~~~~~~~~~
+
+The counterpart of `encoder.py`, for checking the output of the encoder
+without third-party libs and for pulling single frames or thumbnails out
+of large animations:
+
+    gif = decoder.read('maze.gif')
+    len(gif.frames), gif.frames[0].delay
+    canvas = gif.canvas(len(gif.frames) - 1)   # rgb bytes of the last frame
+    open('poster.ppm', 'wb').write(decoder.to_ppm(*gif.thumbnail(canvas, 200)))
+
+The blocks of the file are parsed when it's read, but the pixels of a
+frame are LZW-decoded only when they are needed.
+"""
+from struct import unpack_from
+
+
+__all__ = ['lzw_decompress', 'Frame', 'GIF', 'read', 'parse', 'to_ppm']
+
+
+def lzw_decompress(data, mcl):
+    """
+    Decode the LZW compressed codes `data` (the data sub-blocks joined,
+    without the minimum code length and the block sizes) into a bytearray
+    of color indices, `mcl` is the minimum code length.
+    """
+    clear_code = 1 << mcl
+    end_code = clear_code + 1
+    base = [bytes(bytearray([i])) for i in range(clear_code)] + [b'', b'']
+    table = base[:]
+    size = mcl + 1
+    mask = (1 << size) - 1
+    prev = None
+    out = bytearray()
+    buf = nbits = 0
+
+    for byte in bytearray(data):
+        buf |= byte << nbits
+        nbits += 8
+        while nbits >= size:
+            code = buf & mask
+            buf >>= size
+            nbits -= size
+
+            if code == clear_code:
+                table = base[:]
+                size = mcl + 1
+                mask = (1 << size) - 1
+                prev = None
+                continue
+            if code == end_code:
+                return out
+
+            if code < len(table):
+                entry = table[code]
+                if prev is not None and len(table) < 4096:
+                    table.append(prev + entry[:1])
+            elif prev is not None and code == len(table) and len(table) < 4096:
+                entry = prev + prev[:1]
+                table.append(entry)
+            else:
+                raise ValueError('Invalid LZW code {}.'.format(code))
+
+            out += entry
+            prev = entry
+            if len(table) == 1 << size and size < 12:
+                size += 1
+                mask = (1 << size) - 1
+
+    return out
+
+
+class Frame(object):
+    """
+    One image of a GIF file. `left`, `top`, `width` and `height` are from
+    its image descriptor, `palette` is its local color table (or `None`),
+    `delay`, `trans_index` and `disposal` are from the graphics control
+    block before it (`trans_index=None` means no transparent color).
+    """
+
+    def __init__(self, left, top, width, height, palette, interlaced, mcl, data,
+                 delay=0, trans_index=None, disposal=0):
+        self.left = left
+        self.top = top
+        self.width = width
+        self.height = height
+        self.palette = palette
+        self.interlaced = interlaced
+        self.mcl = mcl
+        self.data = data
+        self.delay = delay
+        self.trans_index = trans_index
+        self.disposal = disposal
+        self._pixels = None
+
+    @property
+    def pixels(self):
+        """The color indices of the frame in row-major order, decoded when first used."""
+        if self._pixels is None:
+            pixels = lzw_decompress(self.data, self.mcl)
+            if len(pixels) < self.width * self.height:
+                raise ValueError('Not enough pixels in the image data.')
+            del pixels[self.width * self.height:]
+            if self.interlaced:
+                pixels = self._deinterlace(pixels)
+            self._pixels = pixels
+        return self._pixels
+
+    def _deinterlace(self, pixels):
+        rows = [y for start, step in ((0, 8), (4, 8), (2, 4), (1, 2))
+                for y in range(start, self.height, step)]
+        w = self.width
+        result = bytearray(len(pixels))
+        for i, y in enumerate(rows):
+            result[y * w: (y + 1) * w] = pixels[i * w: (i + 1) * w]
+        return result
+
+
+class GIF(object):
+    """
+    A parsed GIF file: the logical screen `width` and `height`, the global
+    color table `palette` (or `None`), the background color index `bg_color`,
+    the number of loops `loop` (`None` if there is no loop control block),
+    and the list of `frames`.
+    """
+
+    def __init__(self, width, height, palette, bg_color, loop, frames):
+        self.width = width
+        self.height = height
+        self.palette = palette
+        self.bg_color = bg_color
+        self.loop = loop
+        self.frames = frames
+
+    def composite(self, stop=None):
+        """
+        Draw the frames one by one on the logical screen and yield the rgb
+        bytes of the screen (3 bytes per pixel, row-major) after each frame,
+        up to frame `stop` (included). The same bytearray is updated and
+        yielded each time, copy it to keep it.
+        """
+        w = self.width
+        if self.palette is not None and 3 * self.bg_color + 3 <= len(self.palette):
+            background = bytes(self.palette[3 * self.bg_color: 3 * self.bg_color + 3])
+        else:
+            background = b'\x00\x00\x00'
+        canvas = bytearray(background * (w * self.height))
+        if stop is None:
+            stop = len(self.frames) - 1
+
+        for frame in self.frames[: stop + 1]:
+            palette = frame.palette if frame.palette is not None else self.palette
+            if palette is None:
+                raise ValueError('Missing color table.')
+            colors = [bytes(palette[3 * i: 3 * i + 3]) for i in range(len(palette) // 3)]
+            colors += [b'\x00\x00\x00'] * (256 - len(colors))
+
+            # the part of the frame inside the logical screen.
+            x0, y0 = frame.left, frame.top
+            x1 = min(x0 + frame.width, w)
+            y1 = min(y0 + frame.height, self.height)
+            if frame.disposal == 3:
+                saved = [canvas[3 * (y * w + x0): 3 * (y * w + x1)] for y in range(y0, y1)]
+
+            pixels = frame.pixels
+            trans = frame.trans_index
+            for y in range(y0, y1):
+                offset = (y - y0) * frame.width
+                row = pixels[offset: offset + x1 - x0]
+                start = 3 * (y * w + x0)
+                if trans is None or trans not in row:
+                    canvas[start: start + 3 * len(row)] = b''.join(map(colors.__getitem__, row))
+                else:
+                    for i, c in enumerate(row):
+                        if c != trans:
+                            canvas[start + 3 * i: start + 3 * i + 3] = colors[c]
+
+            yield canvas
+
+            if frame.disposal == 2:
+                for y in range(y0, y1):
+                    canvas[3 * (y * w + x0): 3 * (y * w + x1)] = background * (x1 - x0)
+            elif frame.disposal == 3:
+                for y, row in zip(range(y0, y1), saved):
+                    canvas[3 * (y * w + x0): 3 * (y * w + x1)] = row
+
+    def canvas(self, index):
+        """The rgb bytes of the logical screen after frame `index` is drawn."""
+        if index < 0:
+            index += len(self.frames)
+        canvas = None
+        for canvas in self.composite(index):
+            pass
+        return bytearray(canvas)
+
+    def thumbnail(self, canvas, size):
+        """
+        Shrink the rgb bytes of the logical screen so the larger side is at
+        most `size` pixels (by picking the nearest pixels), return the new
+        width, height and rgb bytes.
+        """
+        factor = max(-(-max(self.width, self.height) // size), 1)
+        w = self.width
+        tw, th = -(-w // factor), -(-self.height // factor)
+        result = bytearray()
+        for y in range(0, self.height, factor):
+            row = canvas[3 * y * w: 3 * (y + 1) * w]
+            for x in range(0, w, factor):
+                result += row[3 * x: 3 * x + 3]
+        return tw, th, result
+
+
+def to_ppm(width, height, rgb):
+    """Pack rgb bytes into a binary PPM image."""
+    return 'P6 {} {} 255\n'.format(width, height).encode('ascii') + bytes(rgb)
+
+
+def _sub_blocks(data, pos):
+    """Join the data sub-blocks starting at `pos`, return them and the position after them."""
+    chunks = []
+    while True:
+        n = data[pos]
+        pos += 1
+        if n == 0:
+            return b''.join(chunks), pos
+        chunks.append(bytes(data[pos: pos + n]))
+        pos += n
+
+
+def parse(data):
+    """Parse the bytes of a GIF file into a `GIF` instance."""
+    data = bytearray(data)
+    if data[:6] not in (b'GIF87a', b'GIF89a'):
+        raise ValueError('Not a GIF file.')
+
+    width, height, flags, bg_color = unpack_from('<2H2B', data, 6)
+    pos = 13
+    palette = None
+    if flags & 0x80:
+        size = 3 << ((flags & 7) + 1)
+        palette = data[pos: pos + size]
+        pos += size
+
+    loop = None
+    frames = []
+    control = {}
+    while True:
+        if pos >= len(data):
+            raise ValueError('Missing trailer.')
+        block = data[pos]
+        pos += 1
+
+        if block == 0x3B:
+            break
+
+        elif block == 0x21:
+            label = data[pos]
+            body, pos = _sub_blocks(data, pos + 1)
+            if label == 0xF9:
+                packed, delay, trans_index = unpack_from('<BHB', body)
+                control = {'delay': delay,
+                           'trans_index': trans_index if packed & 1 else None,
+                           'disposal': (packed >> 2) & 7}
+            elif label == 0xFF and body[:11] == b'NETSCAPE2.0':
+                loop = unpack_from('<H', body, 12)[0]
+
+        elif block == 0x2C:
+            left, top, w, h, flags = unpack_from('<4HB', data, pos)
+            pos += 9
+            local = None
+            if flags & 0x80:
+                size = 3 << ((flags & 7) + 1)
+                local = data[pos: pos + size]
+                pos += size
+            mcl = data[pos]
+            codes, pos = _sub_blocks(data, pos + 1)
+            frames.append(Frame(left, top, w, h, local, bool(flags & 0x40), mcl,
+                                codes, **control))
+            control = {}
+
+        else:
+            raise ValueError('Unknown block 0x{:02X} at byte {}.'.format(block, pos - 1))
+
+    return GIF(width, height, palette, bg_color, loop, frames)
+
+
+def read(filename):
+    """Read and parse a GIF file."""
+    with open(filename, 'rb') as f:
+        return parse(f.read())
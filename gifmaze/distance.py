@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+A distance index of a finished maze, for answering many path queries
+on the same maze without searching it again:
+
+    index = DistanceIndex(maze, root=(0, 0))
+    index.distance(u, v)
+    index.path(u, v)
+
+    anim.run(bfs, maze, index=index, start=(0, 0), end=...)
+
+The index holds the breadth first search tree of the maze from `root`:
+the order in which the cells are flooded, their depths and parents, and
+a jump pointer for each cell. The jump pointers find the lowest common
+ancestor of two cells in O(log n) steps while taking O(1) memory per
+cell, so the distance between any two cells is answered in O(log n)
+time and the path between them in time proportional to its length.
+
+In a perfect maze the path in the tree is the only path between two
+cells. If the maze has loops the distances from `root` are still the
+shortest ones, but the paths between other cells follow the tree.
+"""
+from array import array
+
+
+class DistanceIndex(object):
+    """
+    The breadth first search tree of a maze from `root`. The cells are
+    identified by `(y // 2) * cols + x // 2` where `cols` is the number
+    of cells in a row, the arrays below are indexed by these ids.
+    """
+
+    def __init__(self, maze, root=(0, 0)):
+        cols = (maze.width + 1) // 2
+        ncells = cols * ((maze.height + 1) // 2)
+        self.root = root
+        self._cols = cols
+        # the cells in the order they are flooded, the depth of each
+        # cell (-1 if it's not reached), its parent and its jump pointer.
+        self.order = array('i')
+        self.depth = depth = array('i', [-1]) * ncells
+        self.parent = parent = array('i', [0]) * ncells
+        self.jump = jump = array('i', [0]) * ncells
+
+        r = self._id(root)
+        depth[r] = 0
+        parent[r] = jump[r] = r
+        self.order.append(r)
+
+        head = 0
+        while head < len(self.order):
+            i = self.order[head]
+            head += 1
+            cell = self._cell(i)
+            # the jump pointer of a child of `i`: jump twice from `i` if the
+            # two jumps have the same length, otherwise jump to `i` itself.
+            j1 = jump[i]
+            j2 = jump[j1]
+            child_jump = j2 if depth[i] - depth[j1] == depth[j1] - depth[j2] else i
+
+            for next_cell in maze.get_neighbors(cell):
+                j = self._id(next_cell)
+                if depth[j] < 0 and not maze.barrier(cell, next_cell):
+                    depth[j] = depth[i] + 1
+                    parent[j] = i
+                    jump[j] = child_jump
+                    self.order.append(j)
+
+    def __len__(self):
+        """Number of cells reached from `root`."""
+        return len(self.order)
+
+    def _id(self, cell):
+        return (cell[1] >> 1) * self._cols + (cell[0] >> 1)
+
+    def _cell(self, i):
+        y, x = divmod(i, self._cols)
+        return (2 * x, 2 * y)
+
+    def _reached_id(self, cell):
+        i = self._id(cell)
+        if self.depth[i] < 0:
+            raise ValueError('{} is not reachable from {}.'.format(cell, self.root))
+        return i
+
+    def _ancestor(self, i, d):
+        """The ancestor of the cell with id `i` at depth `d`."""
+        depth, jump = self.depth, self.jump
+        while depth[i] > d:
+            i = jump[i] if depth[jump[i]] >= d else self.parent[i]
+        return i
+
+    def _lca(self, i, j):
+        depth, jump, parent = self.depth, self.jump, self.parent
+        if depth[i] > depth[j]:
+            i = self._ancestor(i, depth[j])
+        else:
+            j = self._ancestor(j, depth[i])
+        # cells of the same depth have jump pointers of the same length.
+        while i != j:
+            if jump[i] != jump[j]:
+                i, j = jump[i], jump[j]
+            else:
+                i, j = parent[i], parent[j]
+        return i
+
+    def lca(self, u, v):
+        """The lowest common ancestor of two cells in the tree."""
+        return self._cell(self._lca(self._reached_id(u), self._reached_id(v)))
+
+    def distance(self, u, v):
+        """The number of steps between two cells along the tree."""
+        i, j = self._reached_id(u), self._reached_id(v)
+        depth = self.depth
+        return depth[i] + depth[j] - 2 * depth[self._lca(i, j)]
+
+    def path(self, u, v):
+        """The cells on the path from `u` to `v` in the tree, both included."""
+        i, j = self._reached_id(u), self._reached_id(v)
+        k = self._lca(i, j)
+        parent = self.parent
+        head = [i]
+        while head[-1] != k:
+            head.append(parent[head[-1]])
+        tail = [j]
+        while tail[-1] != k:
+            tail.append(parent[tail[-1]])
+        return [self._cell(c) for c in head + tail[-2::-1]]
+
+    def flood(self):
+        """
+        Iterate over the reached cells in the order they are flooded from
+        `root`, each item is a tuple `(cell, parent, depth)`.
+        """
+        parent, depth = self.parent, self.depth
+        for i in self.order:
+            yield self._cell(i), self._cell(parent[i]), depth[i]
@@ -26,7 +26,8 @@ from struct import pack
 
 
 __all__ = ['screen_descriptor', 'loop_control_block', 'graphics_control_block',
-           'image_descriptor', 'rectangle', 'pause', 'parse_image', 'lzw_compress'
+           'image_descriptor', 'rectangle', 'pause', 'parse_image', 'lzw_compress',
+           'similar_colors', 'LZWEncoder'
           ]
 
 
@@ -148,6 +149,19 @@ class DataBlock(object):
                 self._bitstream[-1] |= 1 << (self._nbits % 8)
             self._nbits += 1
 
+    def dump_blocks(self):
+        """
+        Pack the complete blocks of 255 bytes written so far and remove them
+        from the bitstream, the remaining bits are kept for later blocks.
+        """
+        bytestream = bytearray()
+        while len(self._bitstream) > 255:
+            bytestream.append(255)
+            bytestream.extend(self._bitstream[:255])
+            del self._bitstream[:255]
+            self._nbits -= 255 * 8
+        return bytestream
+
     def dump_bytes(self):
         """
         Pack the LZW encoded image data into blocks.
@@ -170,10 +184,41 @@ class DataBlock(object):
         return bytestream
 
 
-stream = DataBlock()
+# parameters of the 'adaptive' clear policy of `lzw_compress`.
+CLEAR_WINDOW = 256
+CLEAR_TOLERANCE = 0.1
+
+
+def similar_colors(palette, tolerance, size=None, trans_index=None):
+    """
+    For the lossy mode of `lzw_compress`: return a list whose i-th item is
+    the list of the other colors in `palette` (a 1-d list of r, g, b values)
+    within Euclidean distance `tolerance` of the i-th color, nearest first.
 
+    `size`: the length of the list, e.g. `2**mcl` so that every pixel value
+         has an item. The indices past the end of the palette have no
+         similar colors. `None` means the number of colors in `palette`.
 
-def lzw_compress(input_data, mcl):
+    `trans_index`: `None` or the transparent color index. It's never
+         similar to another color whatever its r, g, b values, so that
+         the lossy mode does not make pixels transparent or opaque.
+    """
+    colors = [tuple(palette[i: i + 3]) for i in range(0, len(palette) - 2, 3)]
+    similar = []
+    for i, (r, g, b) in enumerate(colors):
+        near = []
+        if i != trans_index:
+            for j, (r2, g2, b2) in enumerate(colors):
+                d = (r - r2) ** 2 + (g - g2) ** 2 + (b - b2) ** 2
+                if j != i and j != trans_index and d <= tolerance * tolerance:
+                    near.append((d, j))
+        similar.append([j for _, j in sorted(near)])
+    if size is not None:
+        similar.extend([] for _ in range(size - len(similar)))
+    return similar
+
+
+def lzw_compress(input_data, mcl, clear='eager', lossy=None):
     """
     The Lempel-Ziv-Welch compression algorithm used in the GIF89a specification.
 
@@ -184,6 +229,19 @@ def lzw_compress(input_data, mcl):
 
     `mcl`: minimum code length for compression, it's an integer between 2 and 12.
 
+    `clear`: when to clear the code table once it's full (4096 codes).
+         'eager' emits a clear code immediately. 'adaptive' keeps using
+         the full table (no new codes are added) and clears it only when
+         the pixels per code over the last `CLEAR_WINDOW` codes drops
+         below the ratio achieved while the table was being built.
+         This helps large frames with repetitive content like mazes.
+
+    `lossy`: `None` or a list returned by `similar_colors`. If it's given
+         then a pixel may be encoded as one of the colors similar to its
+         own when this extends the current match in the code table, so
+         gradient-colored images are encoded with longer (and fewer) codes
+         at the cost of slightly wrong colors.
+
     GIF allows the minimum code length as small as 2 and as large as 12.
     Even there are only two colors, the minimum code length must be at least 2.
 
@@ -194,37 +252,151 @@ def lzw_compress(input_data, mcl):
     Therefore the actual smallest code length that will be used is one more
     than `mcl`.
     """
-    clear_code = (1 << mcl)
-    end_code = clear_code + 1
-    max_codes = 4096
-
-    code_length = mcl + 1
-    next_code = end_code + 1
-    # the default initial dict
-    code_table = {(i,): i for i in range(1 << mcl)}
-    # output the clear code
-    stream.encode_bits(clear_code, code_length)
-
-    pattern = tuple()
-    for c in input_data:
-        pattern += (c,)
-        if pattern not in code_table:
-            # add new code to the table
-            code_table[pattern] = next_code
-            # output the prefix
-            stream.encode_bits(code_table[pattern[:-1]], code_length)
-            pattern = (c,)  # suffix becomes the current pattern
-
-            next_code += 1
-            if next_code == 2**code_length + 1:
-                code_length += 1
-
-            if next_code == max_codes:
-                next_code = end_code + 1
-                stream.encode_bits(clear_code, code_length)
-                code_length = mcl + 1
-                code_table = {(i,): i for i in range(1 << mcl)}
-
-    stream.encode_bits(code_table[pattern], code_length)
-    stream.encode_bits(end_code, code_length)
-    return bytearray([mcl]) + stream.dump_bytes() + bytearray([0])
+    encoder = LZWEncoder(mcl, clear, lossy)
+    return encoder.feed(input_data) + encoder.finish()
+
+
+class LZWEncoder(object):
+    """
+    An incremental version of `lzw_compress`: the pixels are fed in chunks
+    (e.g. row by row) and the compressed data is returned as soon as it
+    fills complete data blocks, so the whole frame never needs to be held
+    in memory. The concatenation of the outputs of all calls to `feed` and
+    `finish` is the same as the output of `lzw_compress` for all pixels.
+    """
+
+    def __init__(self, mcl, clear='eager', lossy=None):
+        """
+        The parameters are the same as for `lzw_compress`.
+        """
+        if clear not in ('eager', 'adaptive'):
+            raise ValueError("`clear` must be 'eager' or 'adaptive'.")
+
+        self.mcl = mcl
+        self.clear = clear
+        self.lossy = lossy
+        # a new stream for each frame so that frames can be encoded in several threads.
+        self._stream = DataBlock()
+        self._header = bytearray([mcl])  # output before the first data block
+
+        self._clear_code = (1 << mcl)
+        self._end_code = self._clear_code + 1
+        self._code_length = mcl + 1
+        self._next_code = self._end_code + 1
+        # the default initial dict
+        self._code_table = {(i,): i for i in range(1 << mcl)}
+        # output the clear code
+        self._stream.encode_bits(self._clear_code, self._code_length)
+
+        # statistics for the adaptive policy: pixels and codes consumed while
+        # building the current table, and in the current window after it's full.
+        self._full = False
+        self._build_pixels = self._build_codes = 0
+        self._window_pixels = self._window_codes = 0
+        self._build_ratio = 0
+
+        self._pattern = tuple()
+
+    def feed(self, data):
+        """
+        Encode a chunk of pixels, `data` is a bytes-like object or a list of
+        integers. Return the data blocks completed so far (maybe empty).
+        """
+        if isinstance(data, bytes):
+            data = bytearray(data)
+
+        stream = self._stream
+        mcl = self.mcl
+        lossy = self.lossy
+        clear_code = self._clear_code
+        end_code = self._end_code
+        max_codes = 4096
+        adaptive = self.clear == 'adaptive'
+
+        code_length = self._code_length
+        next_code = self._next_code
+        code_table = self._code_table
+        full = self._full
+        build_pixels, build_codes = self._build_pixels, self._build_codes
+        window_pixels, window_codes = self._window_pixels, self._window_codes
+        build_ratio = self._build_ratio
+        pattern = self._pattern
+
+        for c in data:
+            pattern += (c,)
+            if full:
+                window_pixels += 1
+            else:
+                build_pixels += 1
+
+            if pattern not in code_table and lossy is not None:
+                # try to extend the match with a similar color instead.
+                prefix = pattern[:-1]
+                for c2 in lossy[c]:
+                    if prefix + (c2,) in code_table:
+                        pattern = prefix + (c2,)
+                        break
+
+            if pattern not in code_table:
+                # output the prefix
+                stream.encode_bits(code_table[pattern[:-1]], code_length)
+                if full:
+                    pattern = (c,)
+                    window_codes += 1
+                    if window_codes == CLEAR_WINDOW:
+                        ratio = float(window_pixels - 1) / window_codes
+                        window_pixels, window_codes = 1, 0
+                        if ratio < build_ratio * (1 - CLEAR_TOLERANCE):
+                            full = False
+                            build_pixels, build_codes = 1, 0
+                            stream.encode_bits(clear_code, code_length)
+                            code_length = mcl + 1
+                            code_table = {(i,): i for i in range(1 << mcl)}
+                    continue
+
+                # add new code to the table
+                code_table[pattern] = next_code
+                build_codes += 1
+                pattern = (c,)  # suffix becomes the current pattern
+
+                next_code += 1
+                if next_code == 2**code_length + 1:
+                    code_length += 1
+
+                if next_code == max_codes:
+                    next_code = end_code + 1
+                    if adaptive:
+                        full = True
+                        build_ratio = float(build_pixels - 1) / build_codes
+                        window_pixels, window_codes = 1, 0
+                    else:
+                        stream.encode_bits(clear_code, code_length)
+                        code_length = mcl + 1
+                        code_table = {(i,): i for i in range(1 << mcl)}
+
+        self._code_length = code_length
+        self._next_code = next_code
+        self._code_table = code_table
+        self._full = full
+        self._build_pixels, self._build_codes = build_pixels, build_codes
+        self._window_pixels, self._window_codes = window_pixels, window_codes
+        self._build_ratio = build_ratio
+        self._pattern = pattern
+        return self._output(stream.dump_blocks())
+
+    def finish(self):
+        """
+        Encode the pending pixels and the end code,
+        return the remaining data blocks and the block terminator.
+        """
+        stream = self._stream
+        if self._pattern:
+            stream.encode_bits(self._code_table[self._pattern], self._code_length)
+        stream.encode_bits(self._end_code, self._code_length)
+        return self._output(stream.dump_bytes() + bytearray([0]))
+
+    def _output(self, data):
+        if self._header:
+            data = self._header + data
+            self._header = bytearray()
+        return data
@@ -1,7 +1,5 @@
 # -*- coding: utf-8 -*_
 
-from PIL import Image, ImageFont, ImageDraw
-
 
 def generate_text_mask(size, text, fontfile, fontsize):
     """
@@ -11,7 +9,8 @@ def generate_text_mask(size, text, fontfile, fontsize):
     are considered as 'connective'.
 
     Important: this mask must preserve the connectivity of the graph,
-    otherwise the program will not terminate.
+    otherwise `Maze` raises a `ValueError` (unless its `root` is given,
+    then only the connected component of `root` is used).
 
     ----------
     Parameters
@@ -24,6 +23,8 @@ def generate_text_mask(size, text, fontfile, fontsize):
 
     fontsize: size of the font.
     """
+    from PIL import Image, ImageFont, ImageDraw
+
     img = Image.new('L', size, 'white')
     draw = ImageDraw.Draw(img)
     font = ImageFont.truetype(fontfile, fontsize)
@@ -0,0 +1,448 @@
+# -*- coding: utf-8 -*-
+"""
+Storage backends for very large mazes.
+
+`TiledGrid` keeps the values of the cells in a memory-mapped file
+instead of Python lists, so the operating system pages the grid in and
+out and the resident memory stays bounded. The grid is stored in square
+tiles of `tile`x`tile` cells (each tile is contiguous and stored in
+row-major order), so a region of the maze touches only a few pages.
+
+`CellList` and `ImplicitGraph` replace the list of cells and the
+adjacency dict of an unmasked maze, the cells and their neighbors are
+computed from the coordinates when they are needed. `MaskedGraph` is
+the adjacency of a masked maze computed from a bitmap of its cells.
+
+`SharedGrid` is a `TiledGrid` in shared memory that renderer processes
+can read while the algorithm keeps writing to it.
+
+`SearchTree` holds the search tree of a maze solving algorithm in a
+few bits per cell instead of dicts and sets of tuples.
+"""
+import itertools
+import mmap
+import os
+import sys
+import time
+import weakref
+from array import array
+
+
+class _Column(object):
+    """A view of one column of a `TiledGrid`, supports `column[y]`."""
+
+    __slots__ = ('_data', '_base', '_stride', '_shift', '_mask', '_tile')
+
+    def __init__(self, grid, x):
+        self._data = grid._data
+        self._tile = grid.tile
+        self._shift = grid._shift
+        self._mask = grid.tile - 1
+        self._stride = grid._stride
+        self._base = (x >> grid._shift) * grid.tile * grid.tile + (x & self._mask)
+
+    def __getitem__(self, y):
+        return self._data[self._base + (y >> self._shift) * self._stride
+                          + (y & self._mask) * self._tile]
+
+    def __setitem__(self, y, value):
+        self._data[self._base + (y >> self._shift) * self._stride
+                   + (y & self._mask) * self._tile] = value
+
+
+class TiledGrid(object):
+    """
+    A `width`x`height` grid of cell values in a memory-mapped file.
+    Like the list of columns used by `Maze`, `grid[x][y]` is the value
+    of the cell `(x, y)`.
+    """
+
+    def __init__(self, width, height, filename=None, tile=64, typecode='B'):
+        """
+        filename: the file to hold the grid, it's created (or truncated).
+            `None` means an anonymous memory map.
+
+        tile: size of the tiles, must be a power of 2.
+
+        typecode: the type of the values as in the `array` module,
+            'B' (the default) holds values up to 255 which is enough for
+            the generators, use 'H' or 'I' for `bfs` on large mazes.
+        """
+        size = self._layout(width, height, tile, typecode)
+        if filename is None:
+            self._file = None
+            self._mmap = mmap.mmap(-1, size)
+        else:
+            self._file = open(filename, 'w+b')
+            self._file.truncate(size)
+            self._mmap = mmap.mmap(self._file.fileno(), size)
+
+        self._data = memoryview(self._mmap).cast(typecode)
+        self._columns = [_Column(self, x) for x in range(width)]
+
+    def _layout(self, width, height, tile, typecode):
+        """Set the layout of the tiles, return the size of the grid in bytes."""
+        if tile < 1 or tile & (tile - 1):
+            raise ValueError('The size of the tiles must be a power of 2.')
+
+        self.width = width
+        self.height = height
+        self.tile = tile
+        self.typecode = typecode
+        self._shift = tile.bit_length() - 1
+        ntiles_x = -(-width // tile)
+        ntiles_y = -(-height // tile)
+        self._stride = ntiles_x * tile * tile  # cells in a row of tiles
+        return ntiles_y * self._stride * array(typecode).itemsize
+
+    def _segments(self, y, left, right):
+        """
+        The cells `(left, y), ..., (right, y)` split by the tiles,
+        yield the offset of each piece in the data and its length.
+        """
+        tile = self.tile
+        offset = (y >> self._shift) * self._stride + (y & (tile - 1)) * tile
+        x = left
+        while x <= right:
+            tx, ox = x >> self._shift, x & (tile - 1)
+            end = min(right - x + 1, tile - ox)
+            yield offset + tx * tile * tile + ox, end
+            x += end
+
+    def __getitem__(self, x):
+        return self._columns[x]
+
+    def read_row(self, y, left, right):
+        """Return the values of the cells `(left, y), ..., (right, y)` in a list."""
+        row = []
+        for start, length in self._segments(y, left, right):
+            row.extend(self._data[start: start + length].tolist())
+        return row
+
+    def write_row(self, y, left, values):
+        """
+        Set the cells `(left, y), (left + 1, y), ...` to `values`, which is
+        a list or a buffer (e.g. a NumPy array) of the same type as the grid.
+        """
+        data = memoryview(values) if not isinstance(values, list) else None
+        if data is None or data.format != self._data.format:
+            data = memoryview(array(self._data.format, values))
+
+        i = 0
+        for start, length in self._segments(y, left, left + len(data) - 1):
+            self._data[start: start + length] = data[i: i + length]
+            i += length
+
+    def flush(self):
+        self._mmap.flush()
+
+    def close(self):
+        self._columns = []
+        self._data.release()
+        self._mmap.close()
+        if self._file is not None:
+            self._file.close()
+
+
+class SharedGrid(TiledGrid):
+    """
+    A `TiledGrid` in shared memory (Python 3.8+), for rendering the frames of
+    one animation in several processes. The algorithm writes to the grid as
+    usual, and `publish` copies a region of it into a second buffer that the
+    renderer processes read with `read_region`. A generation counter works
+    as a sequence lock: it's odd while a region is being published, and a
+    reader retries if it changed while the region was read.
+
+    Pickling a `SharedGrid` sends only the name of the shared memory, the
+    unpickled grid is attached to the same memory without copying.
+    """
+
+    def __init__(self, width, height, tile=64, typecode='B', name=None):
+        """
+        tile, typecode: see the doc of `TiledGrid`.
+
+        name: `None` creates a new block of shared memory, otherwise the
+            name of an existing block to attach to.
+        """
+        from multiprocessing import shared_memory
+
+        size = self._layout(width, height, tile, typecode)
+        self._owner = name is None
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=8 + 2 * size)
+        else:
+            self._shm = _attach_shared_memory(shared_memory, name)
+
+        buf = self._shm.buf
+        slices = [buf[:8], buf[8: 8 + size], buf[8 + size: 8 + 2 * size]]
+        self._generation = slices[0].cast('Q')
+        self._data = slices[1].cast(typecode)
+        self._front = slices[2].cast(typecode)
+        self._columns = [_Column(self, x) for x in range(width)]
+        # the views of `buf` must be released before the memory is closed,
+        # or `SharedMemory` can't close it when the grid is collected.
+        # Only the creating process frees the memory, not its forked children.
+        unlink = os.getpid() if self._owner else None
+        self._finalizer = weakref.finalize(
+            self, _release_shared_memory, self._shm, unlink,
+            [self._generation, self._data, self._front] + slices)
+
+    def __reduce__(self):
+        return (SharedGrid, (self.width, self.height, self.tile, self.typecode, self.name))
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def generation(self):
+        """Number of regions published so far."""
+        return self._generation[0] // 2
+
+    def publish(self, left, top, right, bottom):
+        """Copy a region to the buffer of the readers, return the new generation."""
+        generation = self._generation[0]
+        self._generation[0] = generation + 1
+        data, front = self._data, self._front
+        for y in range(top, bottom + 1):
+            for start, length in self._segments(y, left, right):
+                front[start: start + length] = data[start: start + length]
+        self._generation[0] = generation + 2
+        return generation // 2 + 1
+
+    def read_region(self, left, top, right, bottom):
+        """
+        Read a region of the published buffer, return the generation it was
+        published in and the list of its rows. The cells are not copied:
+        each row is a list of memoryviews of the buffer, one for each tile
+        the row crosses. So the region is only the published one until the
+        algorithm process publishes the next region, compare the generation
+        with `self.generation` after using the rows to check it. The views
+        must be released before the grid is closed.
+        """
+        front = self._front
+        while True:
+            generation = self._generation[0]
+            if not generation & 1:
+                break
+            # give the publishing process a chance to finish.
+            time.sleep(0)
+        rows = [[front[start: start + length]
+                 for start, length in self._segments(y, left, right)]
+                for y in range(top, bottom + 1)]
+        return generation // 2, rows
+
+    def flush(self):
+        pass
+
+    def close(self):
+        """Detach from the shared memory, which is freed by its creator."""
+        self._columns = []
+        self._finalizer()
+
+
+def _release_shared_memory(shm, unlink, views):
+    for view in views:
+        view.release()
+    shm.close()
+    if unlink == os.getpid():
+        if sys.version_info < (3, 13):
+            # a copy attached in this process may have unregistered it.
+            from multiprocessing import resource_tracker
+            resource_tracker.register(shm._name, 'shared_memory')
+        shm.unlink()
+
+
+def _attach_shared_memory(shared_memory, name):
+    """
+    Attach to an existing block of shared memory without making a resource
+    tracker free it at exit.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # attaching registers the memory to the tracker, which would free it when
+    # this process exits. The processes started by `multiprocessing` share
+    # the tracker of their parent, where the creator registered the memory:
+    # unregistering it there would race with the other children attaching.
+    import multiprocessing
+    from multiprocessing import resource_tracker
+    shm = shared_memory.SharedMemory(name=name)
+    if multiprocessing.parent_process() is None:
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+class GridSnapshot(object):
+    """
+    A region of a maze read by `Maze.snapshot`, it can be drawn by a `Render`
+    like the maze itself (only the cells in `frame_box` can be read).
+    """
+
+    def __init__(self, maze, frame_box, generation, rows):
+        self.width = maze.width
+        self.height = maze.height
+        self.scaling = maze.scaling
+        self.translation = maze.translation
+        self.frame_box = frame_box
+        self.generation = generation
+        self._rows = rows
+
+    def get_row(self, y, left, right):
+        x0, y0 = self.frame_box[:2]
+        start, stop = left - x0, right - x0 + 1
+        pieces = []
+        for segment in self._rows[y - y0]:
+            if start < len(segment) and stop > 0:
+                pieces.append(segment[max(start, 0): stop])
+            start -= len(segment)
+            stop -= len(segment)
+        return itertools.chain.from_iterable(pieces)
+
+    def reset(self, frame_box=True):
+        pass
+
+
+class CellList(object):
+    """
+    The cells `(x, y)` with even coordinates of an unmasked maze,
+    in the same order as the list built by `Maze`.
+    """
+
+    def __init__(self, width, height):
+        self._ncols = (width + 1) // 2
+        self._len = self._ncols * ((height + 1) // 2)
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError('cell index out of range')
+        y, x = divmod(i, self._ncols)
+        return (2 * x, 2 * y)
+
+    def __iter__(self):
+        for y in range(0, 2 * (self._len // self._ncols), 2):
+            for x in range(0, 2 * self._ncols, 2):
+                yield (x, y)
+
+
+class ImplicitGraph(object):
+    """
+    The adjacency of the cells of an unmasked maze, `graph[cell]`
+    is a new list of the neighbors of `cell`.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+    def __getitem__(self, cell):
+        x, y = cell
+        neighbors = []
+        if x >= 2:
+            neighbors.append((x - 2, y))
+        if y >= 2:
+            neighbors.append((x, y - 2))
+        if x <= self.width - 3:
+            neighbors.append((x + 2, y))
+        if y <= self.height - 3:
+            neighbors.append((x, y + 2))
+        return neighbors
+
+
+class MaskedGraph(object):
+    """
+    The adjacency of the cells of a masked maze given by a bitmap,
+    the bit `(y // 2) * cols + x // 2` of `bitmap` is set if the cell
+    `(x, y)` is in the maze. `graph[cell]` is a new list of its neighbors.
+    """
+
+    def __init__(self, width, height, bitmap):
+        self.width = width
+        self.height = height
+        self.bitmap = bitmap
+        self._cols = (width + 1) // 2
+
+    def __contains__(self, cell):
+        i = (cell[1] >> 1) * self._cols + (cell[0] >> 1)
+        return self.bitmap[i >> 3] >> (i & 7) & 1 == 1
+
+    def __getitem__(self, cell):
+        x, y = cell
+        neighbors = []
+        if x >= 2 and (x - 2, y) in self:
+            neighbors.append((x - 2, y))
+        if y >= 2 and (x, y - 2) in self:
+            neighbors.append((x, y - 2))
+        if x <= self.width - 3 and (x + 2, y) in self:
+            neighbors.append((x + 2, y))
+        if y <= self.height - 3 and (x, y + 2) in self:
+            neighbors.append((x, y + 2))
+        return neighbors
+
+    def cells(self):
+        """The list of the cells in the maze, in the same order as `Maze.cells`."""
+        cols = self._cols
+        return [(2 * (i % cols), 2 * (i // cols))
+                for i in range(cols * ((self.height + 1) // 2))
+                if self.bitmap[i >> 3] >> (i & 7) & 1]
+
+
+class SearchTree(object):
+    """
+    The cells visited by a maze solving algorithm and the parent of each
+    visited cell. A visited cell takes one bit in a bitset and its parent
+    is stored as a 2-bit direction, so the tree of a `width`x`height` maze
+    takes 3 bits per cell however many cells are visited.
+    """
+
+    # the offsets of the parent of a cell for the 4 directions.
+    OFFSETS = ((-2, 0), (0, -2), (2, 0), (0, 2))
+
+    def __init__(self, width, height):
+        self._cols = (width + 1) // 2
+        ncells = self._cols * ((height + 1) // 2)
+        self._visited = bytearray((ncells + 7) >> 3)
+        self._parents = bytearray((ncells + 3) >> 2)
+        self.root = None
+
+    def __contains__(self, cell):
+        i = (cell[1] >> 1) * self._cols + (cell[0] >> 1)
+        return self._visited[i >> 3] >> (i & 7) & 1 == 1
+
+    def add(self, cell, parent=None):
+        """
+        Mark `cell` as visited and remember its parent, which must be adjacent
+        to it. `parent=None` makes `cell` the root of the tree.
+        """
+        i = (cell[1] >> 1) * self._cols + (cell[0] >> 1)
+        self._visited[i >> 3] |= 1 << (i & 7)
+        if parent is None:
+            self.root = cell
+            return
+        direction = (0 if parent[0] < cell[0] else 2 if parent[0] > cell[0]
+                     else 1 if parent[1] < cell[1] else 3)
+        shift = (i & 3) << 1
+        byte = self._parents[i >> 2]
+        self._parents[i >> 2] = byte & ~(3 << shift) | direction << shift
+
+    def parent(self, cell):
+        """The parent of a visited cell, the root is its own parent."""
+        if cell == self.root:
+            return cell
+        i = (cell[1] >> 1) * self._cols + (cell[0] >> 1)
+        dx, dy = self.OFFSETS[self._parents[i >> 2] >> ((i & 3) << 1) & 3]
+        return (cell[0] + dx, cell[1] + dy)
+
+    def path(self, cell):
+        """The path from `cell` back to the root."""
+        if cell not in self:
+            raise ValueError('{} is not reachable from {}.'.format(cell, self.root))
+        path = [cell]
+        while cell != self.root:
+            cell = self.parent(cell)
+            path.append(cell)
+        return path
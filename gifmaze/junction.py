@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+The junction graph of a finished maze: most cells of a perfect maze have
+exactly two passages and only lead from one cell to the next, so they are
+contracted into corridors and the graph has only the junctions, the dead
+ends and a few given terminal cells as its nodes:
+
+    graph = maze.junction_graph(terminals=[start, end])
+    anim.run(bfs, maze, graph=graph, start=start, end=end)
+
+Each corridor is an edge weighted by its number of steps. A corridor only
+remembers the first cell after its node, the other cells are found again
+by following the passages when it's expanded, so the graph takes memory
+in proportion to the number of nodes rather than cells.
+"""
+import heapq
+
+
+class JunctionGraph(object):
+    """
+    `nodes[u]` is the list of the corridors from the node `u`, each one is
+    a tuple `(v, length, first)` where `v` is the node at the other end,
+    `length` is the number of steps from `u` to `v` and `first` is the cell
+    after `u` (which is `v` if they are adjacent).
+    """
+
+    def __init__(self, maze, terminals=()):
+        """
+        maze: a finished maze, its passages must not change afterwards.
+
+        terminals: cells that are made nodes even in the middle of a
+            corridor, e.g. the starting and ending cells of a search.
+        """
+        self._maze = maze
+        nodes = set(terminals)
+        for cell in maze.cells:
+            if cell not in nodes and len(self._passages(cell)) != 2:
+                nodes.add(cell)
+
+        self.nodes = {}
+        for u in nodes:
+            corridors = []
+            for first in self._passages(u):
+                v, length = self._walk(u, first, nodes)
+                corridors.append((v, length, first))
+            self.nodes[u] = corridors
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def _passages(self, cell):
+        maze = self._maze
+        return [v for v in maze.get_neighbors(cell) if not maze.barrier(cell, v)]
+
+    def _walk(self, u, first, nodes):
+        """Follow the corridor from `u` through `first`, return its other end and length."""
+        prev, cell, length = u, first, 1
+        while cell not in nodes:
+            a, b = self._passages(cell)
+            prev, cell = cell, (b if a == prev else a)
+            length += 1
+        return cell, length
+
+    def corridor(self, u, first):
+        """The cells of the corridor from `u` through `first`, without `u`."""
+        cells = [first]
+        prev = u
+        while cells[-1] not in self.nodes:
+            a, b = self._passages(cells[-1])
+            prev, cell = cells[-1], (b if a == prev else a)
+            cells.append(cell)
+        return cells
+
+    def search(self, start, parents, depth_first=False, end=None):
+        """
+        Search the graph from the node `start`, by Dijkstra's algorithm or by
+        depth first search. Yield a tuple `(u, first, v, dist)` for each node
+        `v` when it's reached through the corridor from `u` through `first`,
+        `dist` is the length of the path to `v` that is found. `parents` is
+        a dict that is filled with `parents[v] = (u, first)` for `path`.
+        The search stops after the node `end` is reached.
+        """
+        if start not in self.nodes:
+            raise ValueError('{} is not a node of the junction graph.'.format(start))
+
+        parents[start] = None
+        dist = {start: 0}
+        queue = [(0, start)]
+        while queue:
+            d, u = queue.pop() if depth_first else heapq.heappop(queue)
+            if d > dist[u]:
+                continue
+            if u != start:
+                yield parents[u] + (u, d)
+            if u == end:
+                return
+            for v, length, first in self.nodes[u]:
+                if depth_first:
+                    if v not in parents:
+                        parents[v] = (u, first)
+                        dist[v] = d + length
+                        queue.append((d + length, v))
+                elif v not in dist or d + length < dist[v]:
+                    parents[v] = (u, first)
+                    dist[v] = d + length
+                    heapq.heappush(queue, (d + length, v))
+
+    def path(self, parents, end):
+        """The cells of the path from the root of `parents` to `end`, expanded."""
+        if end not in parents:
+            raise ValueError('{} is not reached by the search.'.format(end))
+        path = [end]
+        while parents[path[-1]] is not None:
+            u, first = parents[path[-1]]
+            path.extend(reversed(self.corridor(u, first)[:-1]))
+            path.append(u)
+        return path[::-1]
@@ -2,7 +2,16 @@
 """
 `Maze` is the top layer object on which we run the algorithms.
 """
-from PIL import Image
+import struct
+import sys
+from array import array
+from itertools import chain
+from .grid import (TiledGrid, SharedGrid, GridSnapshot, CellList, ImplicitGraph,
+                   MaskedGraph, SearchTree)
+
+
+# the values of the 4 cells packed in a byte by `Maze.save_state`.
+_UNPACK2 = [(b & 3, b >> 2 & 3, b >> 4 & 3, b >> 6) for b in range(256)]
 
 
 class Maze(object):
@@ -23,7 +32,8 @@ class Maze(object):
     PATH = 2
     FILL = 3
 
-    def __init__(self, width, height, mask):
+    def __init__(self, width, height, mask, grid_file=None, tile=64, typecode='B',
+                 root=None, shared=False, implicit=False):
         """
         Parameters
         ----------
@@ -33,19 +43,58 @@ class Maze(object):
               If not `None` then this mask image must be of binary type:
               the black pixels are considered as `walls` and are overlayed
               on top of the grid graph. Note the walls must preserve the
-              connectivity of the grid graph, otherwise the program will
-              not terminate.
+              connectivity of the grid graph, otherwise the algorithms will
+              not terminate, so a `ValueError` is raised if they do not
+              (unless `root` is given).
+
+        grid_file: `None` or the path of a file. If it's given then the grid
+              is stored in this file as a memory-mapped `TiledGrid`, for
+              mazes that are too large to be held in Python lists. For an
+              unmasked maze the cells and their neighbors are then computed
+              from the coordinates instead of being stored.
+
+        tile, typecode: the size of the tiles and the type of the values of
+              the cells of the `TiledGrid`, see its doc.
+
+        shared: if `True` then the grid is a `SharedGrid` in shared memory
+              (Python 3.8+), so that the frames can be rendered in other
+              processes, see `publish` and `snapshot`. `grid_file` is ignored.
+
+        root: `None` or a cell. If the mask disconnects the grid graph and
+              `root` is given, then the maze is restricted to the connected
+              component that contains `root`: the other cells are removed
+              from `cells` and are never visited by the algorithms.
+
+        implicit: if `True` then the cells and their neighbors of an unmasked
+              maze are computed from the coordinates (as with a `grid_file`)
+              even if the grid is held in Python lists.
         """
         if (width * height % 2 == 0):
             raise ValueError('The width and height must both be odd integers.')
 
         self.width = width
         self.height = height
-        self._grid = [[0] * height for _ in range(width)]
         self._num_changes = 0   # a counter holds how many cells are changed.
         self._frame_box = None  # a 4-tuple maintains the region that to be updated.
+        self.scaling = 1
+        self.translation = (0, 0)
+
+        if shared or grid_file is not None:
+            if shared:
+                self._grid = SharedGrid(width, height, tile, typecode)
+            else:
+                self._grid = TiledGrid(width, height, grid_file, tile, typecode)
+        else:
+            self._grid = [[0] * height for _ in range(width)]
+
+        if mask is None and (implicit or isinstance(self._grid, TiledGrid)):
+            self.cells = CellList(width, height)
+            self._graph = ImplicitGraph(width, height)
+            return
 
         if mask is not None:
+            # PIL is only needed when a mask is used.
+            from PIL import Image
             if isinstance(mask, Image.Image):
                 mask = mask.convert('L').resize((width, height))
             else:
@@ -74,8 +123,160 @@ class Maze(object):
             return neighbors
 
         self._graph = {v: neighborhood(v) for v in self.cells}
-        self.scaling = 1
-        self.translation = (0, 0)
+        if mask is not None:
+            self._restrict_to_component(root)
+
+    def _restrict_to_component(self, root):
+        """
+        Find the connected component of `root` (or of the first cell)
+        by a linear time search and check if it contains all cells.
+        """
+        if not self.cells:
+            raise ValueError('The mask blocks all cells of the maze.')
+        if root is not None and root not in self._graph:
+            raise ValueError('{} is not a cell of the maze or is blocked by the mask.'.format(root))
+
+        start = self.cells[0] if root is None else root
+        component = set([start])
+        stack = [start]
+        while stack:
+            for v in self._graph[stack.pop()]:
+                if v not in component:
+                    component.add(v)
+                    stack.append(v)
+
+        if len(component) == len(self.cells):
+            return
+        if root is None:
+            raise ValueError('The mask disconnects the maze: only {} of its {} cells '
+                             'are connected to {}, specify `root` to use the '
+                             'component of a given cell.'.format(
+                                 len(component), len(self.cells), start))
+
+        self.cells = [v for v in self.cells if v in component]
+        self._graph = {v: self._graph[v] for v in self.cells}
+
+    MAGIC = b'GMMZ'
+    HEADER = '<4s2I2B'  # magic, width, height, bits per cell, masked
+
+    def save_state(self, filename):
+        """
+        Save the grid and the cells of the maze to a binary file, so it can
+        be solved or rendered again later without running the generator.
+        The cells are packed in 2 bits each if their values are at most 3
+        (walls, tree, path and filled cells), otherwise in 1, 2 or 4 bytes.
+        A masked maze also saves a bitmap of its cells.
+        """
+        width, height = self.width, self.height
+        top = max(max(self.get_row(y, 0, width - 1)) for y in range(height))
+        bits = 2 if top < 4 else 8 if top < 1 << 8 else 16 if top < 1 << 16 else 32
+        cols = (width + 1) // 2
+        ncells = cols * ((height + 1) // 2)
+        masked = len(self.cells) != ncells
+
+        with open(filename, 'wb') as f:
+            f.write(struct.pack(self.HEADER, self.MAGIC, width, height, bits, masked))
+            for y in range(height):
+                row = self.get_row(y, 0, width - 1)
+                if bits == 2:
+                    row += [0] * (-width % 4)
+                    f.write(bytearray(a | b << 2 | c << 4 | d << 6 for a, b, c, d in
+                                      zip(row[0::4], row[1::4], row[2::4], row[3::4])))
+                else:
+                    row = array({8: 'B', 16: 'H', 32: 'I'}[bits], row)
+                    if sys.byteorder == 'big':
+                        row.byteswap()
+                    row.tofile(f)
+
+            if masked:
+                if isinstance(self._graph, MaskedGraph):
+                    bitmap = self._graph.bitmap
+                else:
+                    bitmap = bytearray((ncells + 7) >> 3)
+                    for x, y in self.cells:
+                        i = (y >> 1) * cols + (x >> 1)
+                        bitmap[i >> 3] |= 1 << (i & 7)
+                f.write(bitmap)
+
+    @classmethod
+    def load_state(cls, filename, grid_file=None, tile=64, typecode=None):
+        """
+        Load a maze saved by `save_state`. The file is read in large blocks
+        and the neighbors of the cells are computed only when they are needed.
+        `grid_file`, `tile` and `typecode` are the same as for `Maze`,
+        `typecode=None` means the smallest type that holds the saved values.
+        """
+        with open(filename, 'rb') as f:
+            header = f.read(struct.calcsize(cls.HEADER))
+            magic, width, height, bits, masked = struct.unpack(cls.HEADER, header)
+            if magic != cls.MAGIC:
+                raise ValueError('Not a gifmaze maze file.')
+
+            if typecode is None:
+                typecode = {2: 'B', 8: 'B', 16: 'H', 32: 'I'}[bits]
+            maze = cls(width, height, None, grid_file, tile, typecode, implicit=True)
+            row_bytes = (width + 3) // 4 if bits == 2 else width * bits // 8
+            band = max((1 << 20) // row_bytes, 1)  # rows read at once
+            for top in range(0, height, band):
+                nrows = min(band, height - top)
+                if bits == 2:
+                    data = bytearray(f.read(nrows * row_bytes))
+                    rows = [list(chain.from_iterable(map(_UNPACK2.__getitem__,
+                                                         data[k * row_bytes: (k + 1) * row_bytes])))[:width]
+                            for k in range(nrows)]
+                else:
+                    data = array({8: 'B', 16: 'H', 32: 'I'}[bits])
+                    data.fromfile(f, nrows * width)
+                    if sys.byteorder == 'big':
+                        data.byteswap()
+                    rows = [data[k * width: (k + 1) * width] for k in range(nrows)]
+                maze.mark_rows(top, rows)
+
+            if masked:
+                ncells = ((width + 1) // 2) * ((height + 1) // 2)
+                maze._graph = MaskedGraph(width, height, bytearray(f.read((ncells + 7) >> 3)))
+                maze.cells = maze._graph.cells()
+
+        maze.reset()
+        return maze
+
+    def publish(self):
+        """
+        For a maze with a shared grid: publish the `frame_box` region (the
+        whole maze if it's `None`) to the renderer processes and return its
+        generation. Call this before `frame_box` is reset, e.g. instead of
+        rendering the frame in the algorithm process.
+        """
+        if self._frame_box is not None:
+            return self._grid.publish(*self._frame_box)
+        return self._grid.publish(0, 0, self.width - 1, self.height - 1)
+
+    def snapshot(self, frame_box):
+        """
+        For a maze with a shared grid (usually unpickled in a renderer
+        process): read a published region and return a `GridSnapshot`
+        that a `Render` can draw. Its `generation` attribute tells which
+        `publish` the region comes from.
+        """
+        generation, rows = self._grid.read_region(*frame_box)
+        return GridSnapshot(self, frame_box, generation, rows)
+
+    def close(self):
+        """Release the grid of a maze with a `grid_file` or a shared grid."""
+        if isinstance(self._grid, TiledGrid):
+            self._grid.close()
+
+    def junction_graph(self, terminals=()):
+        """
+        The `JunctionGraph` of this finished maze, `terminals` are the cells
+        that are made nodes of the graph, e.g. the ends of a search.
+        """
+        from .junction import JunctionGraph
+        return JunctionGraph(self, terminals)
+
+    def search_tree(self):
+        """A new empty `SearchTree` for a maze solving algorithm on this maze."""
+        return SearchTree(self.width, self.height)
 
     def get_neighbors(self, cell):
         return self._graph[cell]
@@ -93,6 +294,28 @@ class Maze(object):
         else:
             self._frame_box = (x, y, x, y)
 
+    def mark_rows(self, top, rows):
+        """
+        Overwrite the whole rows `top, top + 1, ...` of the grid at once,
+        `rows` is a list of rows and each row is a list or a buffer (e.g. a
+        NumPy array) of `width` values. This is much faster than marking
+        the cells one by one for the algorithms that carve in bulk.
+        """
+        bottom = top + len(rows) - 1
+        if isinstance(self._grid, TiledGrid):
+            for y, row in enumerate(rows, top):
+                self._grid.write_row(y, 0, row)
+        else:
+            rows = [row.tolist() if hasattr(row, 'tolist') else list(row) for row in rows]
+            for column, values in zip(self._grid, zip(*rows)):
+                column[top: bottom + 1] = values
+
+        self._num_changes += self.width * len(rows)
+        if self._frame_box is not None:
+            top = min(top, self._frame_box[1])
+            bottom = max(bottom, self._frame_box[3])
+        self._frame_box = (0, top, self.width - 1, bottom)
+
     def mark_space(self, c1, c2, value):
         """Mark the space between two adjacent cells."""
         c = ((c1[0] + c2[0]) // 2, (c1[1] + c2[1]) // 2)
@@ -109,6 +332,12 @@ class Maze(object):
         x, y = cell
         return self._grid[x][y]
 
+    def get_row(self, y, left, right):
+        """Return the values of the cells `(left, y), ..., (right, y)` in a list."""
+        if isinstance(self._grid, TiledGrid):
+            return self._grid.read_row(y, left, right)
+        return [column[y] for column in self._grid[left: right + 1]]
+
     def barrier(self, c1, c2):
         """Check if two adjacent cells are connected."""
         x = (c1[0] + c2[0]) // 2
@@ -127,9 +356,11 @@ class Maze(object):
         x, y = cell
         return self._grid[x][y] == Maze.PATH
 
-    def reset(self):
+    def reset(self, frame_box=True):
+        """Clear `num_changes`, and also `frame_box` unless `frame_box=False`."""
         self._num_changes = 0
-        self._frame_box = None
+        if frame_box:
+            self._frame_box = None
 
     @property
     def frame_box(self):
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Progress reporters for the animations.
+
+A reporter is passed to `Animation.run` and receives the number of
+processed cells (from the algorithm), emitted frames and written bytes
+(from the animation). It calls its `report` method at most once every
+`interval` seconds, subclass `Progress` and override `report` to send
+the numbers anywhere.
+
+The algorithms count the processed cells in a local variable and
+update the reporter only when a frame is emitted, so the cost of
+progress reporting does not grow with the number of cells.
+
+`tqdm` is optional: it's imported only when a `TqdmProgress` is started.
+"""
+import logging
+import time
+
+try:
+    from importlib.util import find_spec
+except ImportError:
+    # Python 2
+    from pkgutil import find_loader as find_spec
+
+
+enabled = True
+
+
+class Progress(object):
+    """
+    Base class of the progress reporters.
+    """
+
+    def __init__(self, interval=1.0):
+        """
+        interval: minimum time in seconds between two reports.
+        """
+        self.interval = interval
+        self.start(None, '')
+
+    def start(self, total, desc):
+        """
+        Called by the algorithm when it begins, `total` is the number of
+        cells it's expected to process and `desc` is its description.
+        """
+        self.total = total
+        self.desc = desc
+        self.cells = 0
+        self.frames = 0
+        self.nbytes = 0
+        self._start_time = self._last_report = time.time()
+        return self
+
+    def update(self, n=1):
+        """Called by the algorithm after it processed `n` more cells."""
+        self.cells += n
+        self._tick()
+
+    def frame(self, nbytes):
+        """Called by the animation after it wrote a frame of `nbytes` bytes."""
+        self.frames += 1
+        self.nbytes += nbytes
+        self._tick()
+
+    def close(self):
+        """Called by the animation when the algorithm is finished."""
+        self.report(done=True)
+
+    def _tick(self):
+        now = time.time()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report(done=False)
+
+    @property
+    def elapsed(self):
+        return time.time() - self._start_time
+
+    def stats(self):
+        """The current numbers as a dict."""
+        return {'desc': self.desc,
+                'total': self.total,
+                'cells': self.cells,
+                'frames': self.frames,
+                'bytes': self.nbytes,
+                'elapsed': self.elapsed}
+
+    def report(self, done):
+        """Override this method to publish the numbers."""
+        pass
+
+
+class NullProgress(Progress):
+    """A reporter that does nothing."""
+
+    def __init__(self):
+        Progress.__init__(self, interval=0)
+
+    def update(self, n=1):
+        pass
+
+    def frame(self, nbytes):
+        pass
+
+    def close(self):
+        pass
+
+
+class TqdmProgress(Progress):
+    """Show the progress with a `tqdm` bar."""
+
+    def __init__(self, interval=0.1):
+        self._bar = None
+        Progress.__init__(self, interval)
+
+    def start(self, total, desc):
+        Progress.start(self, total, desc)
+        if self._bar is not None:
+            self._bar.close()
+            self._bar = None
+        if desc:
+            from tqdm import tqdm
+            self._bar = tqdm(total=total, desc=desc)
+        return self
+
+    def report(self, done):
+        if self._bar is None:
+            return
+        self._bar.update(self.cells - self._bar.n)
+        self._bar.set_postfix(frames=self.frames, bytes=self.nbytes, refresh=False)
+        if done:
+            self._bar.close()
+            self._bar = None
+
+
+class LoggingProgress(Progress):
+    """Write the progress to a logger."""
+
+    def __init__(self, logger=None, level=logging.INFO, interval=5.0):
+        self.logger = logger or logging.getLogger('gifmaze')
+        self.level = level
+        Progress.__init__(self, interval)
+
+    def report(self, done):
+        self.logger.log(self.level, '%s: %d/%s cells, %d frames, %d bytes, %.1fs%s',
+                        self.desc, self.cells, self.total, self.frames,
+                        self.nbytes, self.elapsed, ' (done)' if done else '')
+
+
+class MetricsProgress(Progress):
+    """
+    Send the numbers to a metrics sink, which is a function that accepts
+    the dict returned by `stats` plus a boolean item 'done'.
+    """
+
+    def __init__(self, sink, interval=1.0):
+        self.sink = sink
+        Progress.__init__(self, interval)
+
+    def report(self, done):
+        stats = self.stats()
+        stats['done'] = done
+        self.sink(stats)
+
+
+def default_progress():
+    """A `TqdmProgress` if `tqdm` is installed and `enabled` else a `NullProgress`."""
+    if enabled and find_spec('tqdm') is not None:
+        return TqdmProgress()
+    return NullProgress()
+
+
+def progress_bar(render, total, desc):
+    """
+    Called by the algorithms to start the reporter attached to `render`,
+    a `NullProgress` is used if `render` has no reporter.
+    """
+    progress = getattr(render, 'progress', None)
+    if progress is None:
+        progress = NullProgress()
+    return progress.start(total, desc)
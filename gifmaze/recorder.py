@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Record the cells marked by an algorithm into a compact event log,
+and replay this log later to render the same run with other
+parameters (`speed`, `delay`, `cmap`, `scale`, ...) without
+running the algorithm again:
+
+    log = record(wilson, maze, root=(0, 0))
+    log.save('wilson.log')
+
+    log = EventLog.load('wilson.log')
+    maze = Maze(log.width, log.height, None).scale(4)
+    anim.run(replay, maze, log=log, speed=100, delay=2, cmap={...})
+
+A log only holds the changes made by the algorithm, so the maze that
+it's replayed on must be in the same state as the recorded maze was
+before the algorithm ran (e.g. record and replay a maze generation
+algorithm before a maze solving algorithm).
+"""
+import struct
+import sys
+from array import array
+from .progress import progress_bar
+
+
+class EventLog(object):
+    """
+    The recorded events of an algorithm on a maze of size `width`x`height`.
+    The i-th event sets the cell with id `cells[i]` (which is `y*width + x`)
+    to `values[i]`, `frames` holds the number of events before each frame
+    emitted by the algorithm.
+    """
+
+    MAGIC = b'GMEV'
+    HEADER = '<4s4Ic'  # magic, width, height, #events, #frames, value typecode
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.cells = array('I')
+        self.values = array('I')
+        self.frames = array('I')
+
+    def __len__(self):
+        return len(self.cells)
+
+    def save(self, filename):
+        """Save the log to a binary file, the values are packed as small as possible."""
+        top = max(self.values) if len(self.values) > 0 else 0
+        typecode = 'B' if top < 1 << 8 else 'H' if top < 1 << 16 else 'I'
+        values = array(typecode, self.values)
+        with open(filename, 'wb') as f:
+            f.write(struct.pack(self.HEADER, self.MAGIC, self.width, self.height,
+                                len(self.cells), len(self.frames),
+                                typecode.encode('ascii')))
+            for data in (self.cells, values, self.frames):
+                if sys.byteorder == 'big':
+                    data = array(data.typecode, data)
+                    data.byteswap()
+                data.tofile(f)
+
+    @classmethod
+    def load(cls, filename):
+        """Load a log saved by `save`."""
+        with open(filename, 'rb') as f:
+            header = f.read(struct.calcsize(cls.HEADER))
+            magic, width, height, nevents, nframes, typecode = struct.unpack(cls.HEADER, header)
+            if magic != cls.MAGIC:
+                raise ValueError('Not a gifmaze event log.')
+
+            log = cls(width, height)
+            values = array(typecode.decode('ascii'))
+            for data, count in ((log.cells, nevents), (values, nevents), (log.frames, nframes)):
+                data.fromfile(f, count)
+                if sys.byteorder == 'big':
+                    data.byteswap()
+
+        log.values = array('I', values)
+        return log
+
+
+class _Recorder(object):
+    """A render that only records where the algorithm emits frames."""
+
+    def __init__(self, log):
+        self.log = log
+
+    def __call__(self, maze):
+        self.log.frames.append(len(self.log.cells))
+        maze.reset()
+
+
+def record(algo, maze, **kwargs):
+    """
+    Run an algorithm to the end on a maze and return the `EventLog`
+    of the cells it marked. No frames are encoded.
+    """
+    log = EventLog(maze.width, maze.height)
+    append_cell = log.cells.append
+    append_value = log.values.append
+    width = maze.width
+    mark_cell = maze.mark_cell
+    mark_rows = maze.mark_rows
+
+    def recording_mark_cell(cell, value):
+        append_cell(cell[1] * width + cell[0])
+        append_value(value)
+        mark_cell(cell, value)
+
+    def recording_mark_rows(top, rows):
+        # only the cells that change are recorded.
+        for y, row in enumerate(rows, top):
+            old = maze.get_row(y, 0, width - 1)
+            for x, value in enumerate(row.tolist() if hasattr(row, 'tolist') else row):
+                if value != old[x]:
+                    append_cell(y * width + x)
+                    append_value(value)
+        mark_rows(top, rows)
+
+    # shadow the methods on this instance only while the algorithm runs,
+    # `mark_space` and `mark_path` go through `mark_cell` too.
+    maze.mark_cell = recording_mark_cell
+    maze.mark_rows = recording_mark_rows
+    try:
+        for _ in algo(maze, _Recorder(log), **kwargs):
+            pass
+    finally:
+        del maze.mark_cell
+        del maze.mark_rows
+
+    return log
+
+
+def replay(maze, render, log, speed=None):
+    """
+    Replay an `EventLog` on a maze as if the recorded algorithm was running.
+    `speed=None` emits the frames where the algorithm emitted them,
+    otherwise a frame is emitted every `speed` changed cells.
+    """
+    if (maze.width, maze.height) != (log.width, log.height):
+        raise ValueError('The size of the maze does not match the log.')
+
+    bar = progress_bar(render, total=len(log), desc="Replaying event log")
+    width = log.width
+    frames = iter(log.frames) if speed is None else iter(())
+    next_frame = next(frames, None)
+    count = 0
+
+    for i, (cell, value) in enumerate(zip(log.cells, log.values)):
+        if i == next_frame:
+            bar.update(count)
+            count = 0
+            yield render(maze)
+            while next_frame == i:
+                next_frame = next(frames, None)
+
+        y, x = divmod(cell, width)
+        maze.mark_cell((x, y), value)
+        count += 1
+
+        if speed is not None and maze.num_changes >= speed:
+            bar.update(count)
+            count = 0
+            yield render(maze)
+
+    if maze.num_changes > 0:
+        yield render(maze)
+    bar.update(count)
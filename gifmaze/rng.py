@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+The random numbers used by the randomized algorithms.
+
+Each run of an algorithm draws from its own `RandomSource`, so a run is
+reproducible from its `seed` and does not depend on (or disturb) other
+users of the `random` module. If no seed is given it's drawn from the
+`random` module, so `random.seed(...)` still makes the runs reproducible.
+
+The steps of the algorithms only need a uniform float, a random choice
+among at most 4 neighbors, or a random order of at most 4 neighbors.
+`random.Random.choice` and `shuffle` draw integers by rejection sampling
+in Python code, which costs several times more than the float itself.
+`RandomSource` decodes them from one float each instead: a choice is an
+index scaled from the float and an order is looked up in a table of the
+permutations.
+"""
+import random
+from itertools import permutations
+
+
+# `_PERMUTATIONS[n]` is the list of the permutations of `range(n)`.
+_PERMUTATIONS = [list(permutations(range(n))) for n in range(5)]
+
+
+class RandomSource(random.Random):
+    """
+    A random number generator for one run of an algorithm. `random()`,
+    `getrandbits()` and the other methods of `random.Random` are available,
+    `choice` and `shuffle` are faster versions for short sequences.
+    """
+
+    def __init__(self, seed=None):
+        """
+        seed: `None` draws a seed from the `random` module.
+        """
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.seed_value = seed
+        random.Random.__init__(self, seed)
+
+    def choice(self, seq):
+        """A random item of a non-empty sequence."""
+        return seq[int(self.random() * len(seq))]
+
+    def shuffle(self, seq):
+        """Shuffle a list (or an array) in place."""
+        n = len(seq)
+        if n < len(_PERMUTATIONS):
+            table = _PERMUTATIONS[n]
+            items = [seq[i] for i in table[int(self.random() * len(table))]]
+            for i, item in enumerate(items):
+                seq[i] = item
+            return
+        rand = self.random
+        for i in range(n - 1, 0, -1):
+            j = int(rand() * (i + 1))
+            seq[i], seq[j] = seq[j], seq[i]
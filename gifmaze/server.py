@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+A small HTTP server that streams GIF animations to the clients
+while they are being rendered. It uses only the standard library
+(`asyncio`), Python 3.7+ is required for this module, it's not
+imported by `import gifmaze`.
+
+Each url path is bound to a `scene`, which is a function that takes
+no arguments and returns a tuple `(surface, animate)`:
+
+    def scene():
+        surface = gm.GIFSurface(600, 400, bg_color=0)
+        surface.set_palette('kw')
+
+        def animate(surface):
+            anim = gm.Animation(surface)
+            maze = gm.Maze(149, 99, None).scale(4).translate((2, 2))
+            anim.run(prim, maze, speed=30, delay=5, mcl=2)
+
+        return surface, animate
+
+    GIFServer({'/prim.gif': scene}).run(port=8000)
+
+The global color table of the surface must be set before it's returned.
+For each request the server sends the GIF header at once, then runs
+`animate` on a worker thread and sends each frame as an HTTP chunk
+as soon as it's written to the surface. At most `max_renders` scenes
+are rendered at the same time (the other requests wait), and a render
+is blocked when `max_pending` frames are waiting for a slow client.
+"""
+import sys
+
+if sys.version_info < (3, 7):
+    raise ImportError('gifmaze.server requires Python 3.7+.')
+
+from ._server import ClientGone, QueueWriter, GIFServer
+
+
+__all__ = ['ClientGone', 'QueueWriter', 'GIFServer']
@@ -4,7 +4,6 @@
 the information of the output GIF image.
 """
 from io import BytesIO
-from PIL import Image
 from . import encoder
 
 
@@ -44,6 +43,8 @@ class GIFSurface(object):
         The size of the returned surface is the same with the image's.
         The image is then painted as the background.
         """
+        from PIL import Image
+
         # the image file usually contains more than 256 colors
         # so we need to convert it to gif format first.
         with BytesIO() as temp_io:
@@ -56,6 +57,18 @@ class GIFSurface(object):
     def write(self, data):
         self._io.write(data)
 
+    def stream_to(self, stream):
+        """
+        Return the bytes of the image written so far (the header included,
+        the trailer excluded) and write the following frames to `stream`,
+        a file-like object, instead of the in-memory file. This is used to
+        send the frames of an animation while it's being rendered.
+        """
+        data = self._gif_header + self._io.getvalue()
+        self._io.close()
+        self._io = stream
+        return data
+
     def set_palette(self, palette):
         """
         Set the global color table of the GIF image.
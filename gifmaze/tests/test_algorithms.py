@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+
+from gifmaze import Maze
+from gifmaze import algorithms
+
+
+GENERATORS = [
+    ('prim', {}),
+    ('random_dfs', {}),
+    ('wilson', {}),
+    ('kruskal', {}),
+    ('eller', {}),
+    ('binary_tree', {}),
+    ('sidewinder', {}),
+    ('tiled_spanning_tree', {'tile': 4, 'workers': 1}),
+    ('tiled_spanning_tree', {'tile': 4, 'workers': 1, 'uniform': True}),
+]
+
+
+def reset(maze):
+    maze.reset()
+
+
+def generate(name, seed=None, **kwargs):
+    if name in ('binary_tree', 'sidewinder'):
+        pytest.importorskip('numpy')
+    maze = Maze(21, 15, None)
+    for _ in getattr(algorithms, name)(maze, reset, seed=seed, **kwargs):
+        pass
+    return [maze.get_row(y, 0, maze.width - 1) for y in range(maze.height)]
+
+
+@pytest.mark.parametrize('name, kwargs', GENERATORS)
+def test_generators_make_perfect_mazes(name, kwargs):
+    grid = generate(name, seed=1, **kwargs)
+    # 11x8 cells and the passages of a spanning tree between them.
+    assert sum(row.count(Maze.TREE) for row in grid) == 2 * 11 * 8 - 1
+
+
+@pytest.mark.parametrize('name, kwargs', GENERATORS)
+def test_generators_are_reproducible(name, kwargs):
+    assert generate(name, seed=5, **kwargs) == generate(name, seed=5, **kwargs)
+    assert generate(name, seed=5, **kwargs) != generate(name, seed=6, **kwargs)
+
+    random.seed(7)
+    first = generate(name, **kwargs)
+    random.seed(7)
+    assert generate(name, **kwargs) == first
+
+
+def test_astar_is_reproducible():
+    grid = generate('prim', seed=1)
+
+    def solve(seed):
+        maze = Maze(21, 15, None)
+        for y, row in enumerate(grid):
+            maze.mark_rows(y, [row])
+        for _ in algorithms.astar(maze, reset, start=(0, 0), end=(20, 14), seed=seed):
+            pass
+        return [maze.get_row(y, 0, maze.width - 1) for y in range(maze.height)]
+
+    assert solve(3) == solve(3)
+
+
+def test_kruskal_on_a_tiled_grid(tmp_path):
+    maze = Maze(21, 15, None, grid_file=str(tmp_path / 'grid'), tile=4)
+    for _ in algorithms.kruskal(maze, reset, seed=1):
+        pass
+    grid = [maze.get_row(y, 0, maze.width - 1) for y in range(maze.height)]
+    maze.close()
+    assert grid == generate('kruskal', seed=1)
+
+
+def unique_path(grid, start, end):
+    """The path between two cells of a perfect maze, found with dicts."""
+    parents = {start: None}
+    queue = [start]
+    for x, y in queue:
+        for dx, dy in ((-2, 0), (2, 0), (0, -2), (0, 2)):
+            v = (x + dx, y + dy)
+            if (0 <= v[0] < len(grid[0]) and 0 <= v[1] < len(grid) and v not in parents
+                    and grid[y + dy // 2][x + dx // 2] != Maze.WALL):
+                parents[v] = (x, y)
+                queue.append(v)
+    path = [end]
+    while parents[path[-1]] is not None:
+        path.append(parents[path[-1]])
+    return path
+
+
+@pytest.mark.parametrize('name, kwargs', [('bfs', {}), ('dfs', {}), ('astar', {'seed': 1}),
+                                          ('bfs', {'index': True}), ('bfs', {'graph': True}),
+                                          ('dfs', {'graph': True})])
+def test_solvers_find_the_path(name, kwargs):
+    from gifmaze.distance import DistanceIndex
+
+    grid = generate('wilson', seed=4)
+    start, end = (0, 0), (20, 14)
+    maze = Maze(21, 15, None)
+    for y, row in enumerate(grid):
+        maze.mark_rows(y, [row])
+    if kwargs.get('index'):
+        kwargs['index'] = DistanceIndex(maze, start)
+    if kwargs.get('graph'):
+        kwargs['graph'] = maze.junction_graph(terminals=[start, end])
+    for _ in getattr(algorithms, name)(maze, reset, start=start, end=end, **kwargs):
+        pass
+
+    path = unique_path(grid, start, end)
+    cells = set(path) | set(((u[0] + v[0]) // 2, (u[1] + v[1]) // 2) for u, v in zip(path, path[1:]))
+    marked = set((x, y) for y in range(maze.height) for x in range(maze.width)
+                 if maze.in_path((x, y)))
+    assert marked == cells
+
+
+def test_prim_frontier():
+    from gifmaze.algorithms.prim import _Frontier
+
+    rng = random.Random(1)
+    frontier = _Frontier()
+    best = {}  # the smallest key and its parent of each cell in the frontier
+    for step in range(2000):
+        if best and rng.random() < 0.4:
+            cell, parent = frontier.pop()
+            key = min(k for k, p in best.values())
+            assert best.pop(cell) == (key, parent)
+        else:
+            cell, key, parent = rng.randrange(50), rng.random(), step
+            frontier.push(cell, key, parent)
+            if cell not in best or key < best[cell][0]:
+                best[cell] = (key, parent)
+        assert len(frontier) == len(best)
+
+
+@pytest.mark.parametrize('uniform', [False, True])
+def test_tiled_spanning_tree_does_not_depend_on_workers(uniform):
+    single = generate('tiled_spanning_tree', seed=8, tile=4, workers=1, uniform=uniform)
+    assert generate('tiled_spanning_tree', seed=8, tile=4, workers=2, uniform=uniform) == single
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from gifmaze import GIFSurface, Animation, Maze, decoder
+from gifmaze.algorithms import prim, random_dfs
+
+
+def make_surface():
+    surface = GIFSurface(130, 50, bg_color=0)
+    surface.set_palette('kwryb')
+    return surface
+
+
+def make_mazes(x=66):
+    return (Maze(31, 21, None).scale(2).translate((2, 2)),
+            Maze(31, 21, None).scale(2).translate((x, 2)))
+
+
+def decode(surface, tmp_path):
+    filename = str(tmp_path / 'anim.gif')
+    surface.save(filename)
+    surface.close()
+    return decoder.read(filename)
+
+
+@pytest.mark.parametrize('x', [66, 64])
+@pytest.mark.parametrize('options', [{}, {'trans_index': 4, 'mcl': 3}, {'local_table': True},
+                                     {'lossy': 50, 'mcl': 3}])
+def test_run_many_plays_one_frame_per_round(tmp_path, options, x):
+    surface = make_surface()
+    maze1, maze2 = make_mazes(x)
+    options = dict({'delay': 5, 'mcl': 2, 'progress': False}, **options)
+    Animation(surface).run_many([(prim, maze1, {'speed': 30, 'seed': 1}),
+                                 (random_dfs, maze2, {'speed': 10, 'seed': 2})],
+                                **options)
+    gif = decode(surface, tmp_path)
+
+    # the same algorithms one by one.
+    counts = []
+    expected = make_surface()
+    runs = [(prim, {'speed': 30, 'seed': 1}), (random_dfs, {'speed': 10, 'seed': 2})]
+    for i, (algo, kwargs) in enumerate(runs):
+        alone = make_surface()
+        Animation(alone).run(algo, make_mazes(x)[i], **dict(options, **kwargs))
+        counts.append(len(decode(alone, tmp_path).frames) - 1)
+        Animation(expected).run(algo, make_mazes(x)[i], **dict(options, **kwargs))
+    expected = decode(expected, tmp_path)
+    rounds = max(counts)
+
+    # only the last image of each round has a delay.
+    assert set(frame.delay for frame in gif.frames[1:]) == {0, 5}
+    assert sum(frame.delay == 5 for frame in gif.frames) == rounds
+    if x == 66:
+        # one image for each region.
+        assert len(gif.frames) == len(expected.frames)
+    else:
+        # the adjacent regions are composited.
+        assert len(gif.frames) < len(expected.frames)
+    assert gif.canvas(-1) == expected.canvas(-1)
+
+
+def render_prim(tmp_path, palette='kwryb', **options):
+    surface = make_surface()
+    surface.set_palette(palette)
+    maze = Maze(31, 21, None).scale(2).translate((2, 2))
+    options = dict({'speed': 30, 'delay': 5, 'mcl': 3, 'seed': 1, 'progress': False}, **options)
+    Animation(surface).run(prim, maze, **options)
+    return decode(surface, tmp_path)
+
+
+def canvases(gif):
+    return [bytes(canvas) for canvas in gif.composite()]
+
+
+def test_local_color_tables(tmp_path):
+    palette = [0, 0, 0, 255, 255, 255] + list(range(254)) * 3
+    plain = render_prim(tmp_path, palette, mcl=8, speed=100)
+    local = render_prim(tmp_path, palette, mcl=8, speed=100, local_table=True, trans_index=4)
+    # the frames of two colors are encoded with 2 bits instead of 8.
+    assert any(frame.palette is not None and frame.mcl == 2 for frame in local.frames)
+    assert len(local.frames) == len(plain.frames)
+    assert canvases(local) == canvases(plain)
+
+
+def test_min_delay_merges_frames(tmp_path):
+    plain = render_prim(tmp_path, delay=1)
+    merged = render_prim(tmp_path, delay=1, min_delay=3)
+    assert all(frame.delay >= 3 for frame in merged.frames[1:])
+    assert len(merged.frames) - 1 == -(-(len(plain.frames) - 1) // 3)
+    assert sum(f.delay for f in merged.frames) == sum(f.delay for f in plain.frames)
+    assert canvases(merged)[-1] == canvases(plain)[-1]
+
+
+def test_lossy_keeps_transparent_pixels(tmp_path):
+    # the walls are transparent, their color is within the tolerance of the tree.
+    palette = [0, 0, 0, 255, 255, 255, 255, 0, 0, 255, 255, 0, 250, 250, 250] + [0] * 9
+    options = {'trans_index': 4, 'cmap': {0: 4}}
+    lossy = render_prim(tmp_path, palette, lossy=20, **options)
+    assert canvases(lossy) == canvases(render_prim(tmp_path, palette, **options))
+
+def test_targets_match_separate_runs(tmp_path):
+    surfaces = [make_surface(), GIFSurface(260, 180, bg_color=0)]
+    surfaces[1].set_palette('kwryb')
+    maze = Maze(31, 21, None).scale(2).translate((2, 2))
+    targets = [(surfaces[0], None, None, None), (surfaces[1], 8, (4, 4), {1: 2})]
+    Animation(make_surface()).run(prim, maze, speed=30, delay=5, mcl=3, seed=1,
+                                  progress=False, targets=targets)
+
+    assert canvases(decode(surfaces[0], tmp_path)) == canvases(render_prim(tmp_path))
+
+    expected = GIFSurface(260, 180, bg_color=0)
+    expected.set_palette('kwryb')
+    maze = Maze(31, 21, None).scale(8).translate((4, 4))
+    Animation(expected).run(prim, maze, speed=30, delay=5, mcl=3, seed=1,
+                            progress=False, cmap={1: 2})
+    assert canvases(decode(surfaces[1], tmp_path)) == canvases(decode(expected, tmp_path))
+
+
+def test_estimate(tmp_path):
+    surface = make_surface()
+    maze = Maze(31, 21, None).scale(2).translate((2, 2))
+    actual = render_prim(tmp_path)
+    nbytes = sum(len(frame.data) for frame in actual.frames[1:])
+
+    # encoding every frame gives the exact numbers.
+    result = Animation(surface).estimate(prim, maze, speed=30, delay=5, mcl=3, seed=1,
+                                         sample=1)
+    assert result['complete'] and result['sampled_frames'] == result['frames']
+    assert result['frames'] == len(actual.frames) - 1
+    assert nbytes < result['bytes'] < nbytes + 40 * result['frames']
+
+    maze = Maze(31, 21, None).scale(2).translate((2, 2))
+    result = Animation(surface).estimate(prim, maze, speed=30, delay=5, mcl=3, seed=1,
+                                         max_frames=3)
+    assert not result['complete'] and result['sampled_frames'] == 1
+    assert 0 < result['frames'] < 2 * len(actual.frames)
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from gifmaze import GIFSurface, encoder, decoder
+
+
+def make_gif(tmp_path, frames=(), loop=3):
+    surface = GIFSurface(8, 6, loop=loop, bg_color=1)
+    surface.set_palette('kwry')
+    for frame in frames:
+        surface.write(frame)
+    filename = str(tmp_path / 'test.gif')
+    surface.save(filename)
+    surface.close()
+    return decoder.read(filename)
+
+
+def pixels(gif, canvas):
+    """The color indices of the rgb bytes of a canvas."""
+    colors = [bytes(gif.palette[i: i + 3]) for i in range(0, len(gif.palette), 3)]
+    return [colors.index(bytes(canvas[i: i + 3])) for i in range(0, len(canvas), 3)]
+
+
+def test_header_and_frames(tmp_path):
+    gif = make_gif(tmp_path, [encoder.pause(7, 0),
+                              encoder.graphics_control_block(4) + encoder.rectangle(2, 1, 3, 2, 2)])
+    assert (gif.width, gif.height, gif.loop) == (8, 6, 3)
+    assert len(gif.palette) == 12
+    assert [(f.left, f.top, f.width, f.height) for f in gif.frames] == \
+        [(0, 0, 8, 6), (0, 0, 1, 1), (2, 1, 3, 2)]
+    assert [(f.delay, f.trans_index) for f in gif.frames] == [(0, None), (7, 0), (4, None)]
+
+    # the paused pixel is transparent, the rectangle is painted over the background.
+    assert pixels(gif, gif.canvas(1)) == [1] * 48
+    assert pixels(gif, gif.canvas(-1)) == [1] * 8 + ([1] * 2 + [2] * 3 + [1] * 3) * 2 + [1] * 24
+
+
+def test_interlaced_and_local_table(tmp_path):
+    rows = [[y % 4] * 8 for y in range(6)]
+    order = [y for start, step in ((0, 8), (4, 8), (2, 4), (1, 2)) for y in range(start, 6, step)]
+    data = encoder.lzw_compress([c for y in order for c in rows[y]], mcl=2)
+    local = bytearray([0, 0, 0, 10, 10, 10, 20, 20, 20, 30, 30, 30])
+    frame = encoder.image_descriptor(0, 0, 8, 6, 0b11000001) + local + data
+    gif = make_gif(tmp_path, [frame])
+
+    assert gif.frames[1].interlaced
+    assert gif.frames[1].pixels == bytearray(c for row in rows for c in row)
+    canvas = gif.canvas(1)
+    assert list(canvas[::24]) == [0, 10, 20, 30, 0, 10]
+
+
+def test_thumbnail_and_ppm(tmp_path):
+    gif = make_gif(tmp_path, [encoder.rectangle(0, 0, 4, 6, 2)])
+    width, height, rgb = gif.thumbnail(gif.canvas(-1), 4)
+    assert (width, height, len(rgb)) == (4, 3, 36)
+    assert bytes(rgb[:3]) == b'\xff\x00\x00' and bytes(rgb[-3:]) == b'\xff\xff\xff'
+    assert decoder.to_ppm(width, height, rgb) == b'P6 4 3 255\n' + bytes(rgb)
+
+
+def test_invalid_files():
+    with pytest.raises(ValueError):
+        decoder.parse(b'PNG...')
+    with pytest.raises(ValueError):
+        decoder.parse(b'GIF89a' + bytes(bytearray([1, 0, 1, 0, 0, 0, 0])))
+
+
+def test_invalid_lzw_codes():
+    # mcl=2: the first code 7 is past the table of 6 codes (4 colors, clear, end).
+    with pytest.raises(ValueError):
+        decoder.lzw_decompress(bytearray([0b111]), 2)
+    # the same right after a clear code.
+    with pytest.raises(ValueError):
+        decoder.lzw_decompress(bytearray([0b111100, 0]), 2)
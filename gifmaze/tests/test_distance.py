@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+
+from gifmaze import Maze
+from gifmaze.algorithms import wilson
+from gifmaze.distance import DistanceIndex
+
+
+def perfect_maze():
+    maze = Maze(31, 21, None)
+    for _ in wilson(maze, lambda maze: maze.reset(), seed=3):
+        pass
+    return maze
+
+
+def tree_path(maze, u, v):
+    """The path between two cells of a perfect maze, by a search from `u`."""
+    parents = {u: None}
+    queue = [u]
+    for cell in queue:
+        for w in maze.get_neighbors(cell):
+            if w not in parents and not maze.barrier(cell, w):
+                parents[w] = cell
+                queue.append(w)
+    path = [v]
+    while parents[path[-1]] is not None:
+        path.append(parents[path[-1]])
+    return path[::-1]
+
+
+def test_paths_and_distances():
+    maze = perfect_maze()
+    index = DistanceIndex(maze, root=(0, 0))
+    assert len(index) == len(maze.cells)
+
+    rng = random.Random(1)
+    cells = list(maze.cells)
+    for _ in range(50):
+        u, v = rng.choice(cells), rng.choice(cells)
+        path = tree_path(maze, u, v)
+        assert index.path(u, v) == path
+        assert index.distance(u, v) == len(path) - 1
+        # the lowest common ancestor is the cell of the path closest to the root.
+        assert index.lca(u, v) == min(path, key=lambda c: index.distance((0, 0), c))
+
+
+def test_flood_order():
+    maze = perfect_maze()
+    index = DistanceIndex(maze, root=(10, 10))
+    flood = list(index.flood())
+    assert flood[0] == ((10, 10), (10, 10), 0)
+    depths = [depth for cell, parent, depth in flood]
+    assert depths == sorted(depths)
+    assert all(index.distance(cell, parent) == (depth > 0) for cell, parent, depth in flood)
+
+
+def test_unreachable_cells():
+    maze = Maze(5, 5, None)  # no passages yet
+    index = DistanceIndex(maze, root=(0, 0))
+    assert len(index) == 1
+    with pytest.raises(ValueError):
+        index.distance((0, 0), (2, 2))
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+
+from gifmaze import encoder
+from gifmaze.decoder import lzw_decompress, _sub_blocks
+
+
+def decompress(compressed, mcl):
+    """Decode the output of `lzw_compress` (with the mcl byte and the blocks)."""
+    assert compressed[0] == mcl
+    data, pos = _sub_blocks(bytearray(compressed), 1)
+    assert pos == len(compressed)
+    return lzw_decompress(data, mcl)
+
+
+@pytest.mark.parametrize('clear', ['eager', 'adaptive'])
+@pytest.mark.parametrize('mcl', [2, 4, 8])
+def test_lzw_round_trip(mcl, clear):
+    rng = random.Random(mcl)
+    for n in (0, 1, 2, 100, 5000, 30000):
+        # runs of random lengths make the code table fill up and clear.
+        pixels = []
+        while len(pixels) < n:
+            pixels.extend([rng.randrange(1 << mcl)] * rng.randint(1, 20))
+        del pixels[n:]
+        compressed = encoder.lzw_compress(pixels, mcl, clear)
+        assert list(decompress(compressed, mcl)) == pixels
+
+
+def test_lossy_replaces_only_similar_colors():
+    palette = [0, 0, 0, 10, 10, 10, 255, 255, 255, 250, 250, 250]
+    similar = encoder.similar_colors(palette, 20)
+    assert similar == [[1], [0], [3], [2]]
+
+    rng = random.Random(1)
+    pixels = [rng.randrange(4) for _ in range(2000)]
+    compressed = encoder.lzw_compress(pixels, 2, lossy=similar)
+    decoded = decompress(compressed, 2)
+    assert len(decoded) == len(pixels)
+    assert all(c == d or d in similar[c] for c, d in zip(pixels, decoded))
+    assert len(compressed) < len(encoder.lzw_compress(pixels, 2))
+
+
+def test_similar_colors_size():
+    palette = [0, 0, 0, 255, 255, 255]
+    assert encoder.similar_colors(palette, 10, 4) == [[], [], [], []]
+    assert len(encoder.similar_colors(palette, 10, 1)) == 2
+
+
+def test_similar_colors_leave_out_the_transparent_color():
+    palette = [0, 0, 0, 10, 10, 10, 5, 5, 5, 255, 255, 255]
+    assert encoder.similar_colors(palette, 20) == [[2, 1], [2, 0], [0, 1], []]
+    assert encoder.similar_colors(palette, 20, 5, trans_index=2) == [[1], [0], [], [], []]
+
+
+@pytest.mark.parametrize('clear', ['eager', 'adaptive'])
+def test_incremental_encoder_matches_lzw_compress(clear):
+    rng = random.Random(2)
+    pixels = [rng.randrange(8) // 3 for _ in range(20000)]
+    expected = encoder.lzw_compress(pixels, 2, clear)
+
+    lzw = encoder.LZWEncoder(2, clear)
+    output = bytearray()
+    start = 0
+    while start < len(pixels):
+        size = rng.randint(0, 700)
+        # chunks of lists and of bytes.
+        chunk = pixels[start: start + size]
+        output += lzw.feed(chunk if size % 2 else bytearray(chunk))
+        start += size
+    output += lzw.finish()
+    assert output == expected
+
+
+def test_incremental_encoder_checks_the_clear_policy():
+    with pytest.raises(ValueError):
+        encoder.LZWEncoder(2, 'never')
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+import gc
+import multiprocessing
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import gifmaze
+from gifmaze.grid import GridSnapshot, TiledGrid
+from gifmaze.maze import Maze
+
+
+shared_memory = pytest.importorskip('multiprocessing.shared_memory')
+
+
+POOL_SCRIPT = textwrap.dedent('''
+    import multiprocessing
+    import sys
+    from concurrent.futures import ProcessPoolExecutor
+
+    from gifmaze.maze import Maze
+
+
+    def read(maze, box):
+        return maze.snapshot(box).generation
+
+
+    if __name__ == '__main__':
+        maze = Maze(31, 21, None, shared=True)
+        maze.mark_cell((4, 6), 1)
+        box = (0, 0, maze.width - 1, maze.height - 1)
+        generation = maze.publish()
+        context = multiprocessing.get_context(sys.argv[1])
+        with ProcessPoolExecutor(2, mp_context=context) as pool:
+            results = list(pool.map(read, [maze] * 6, [box] * 6))
+        assert results == [generation] * 6, results
+        maze.close()
+        print('ok')
+''')
+
+
+@pytest.mark.parametrize('method', ['fork', 'spawn'])
+def test_shared_grid_in_pool(tmp_path, method):
+    if method not in multiprocessing.get_all_start_methods():
+        pytest.skip('{} is not available'.format(method))
+    script = tmp_path / 'pool.py'
+    script.write_text(POOL_SCRIPT)
+    root = os.path.dirname(gifmaze.__path__[0])
+    result = subprocess.run([sys.executable, str(script), method], cwd=root,
+                            env={'PYTHONPATH': root}, capture_output=True,
+                            text=True, timeout=120)
+    assert result.stdout.strip() == 'ok', result.stderr
+    # no errors from collecting the attached grids or from the resource tracker.
+    assert 'Error' not in result.stderr, result.stderr
+
+
+def test_shared_grid_attached_copy_is_collected():
+    from gifmaze.grid import SharedGrid
+
+    errors = []
+    hook, sys.unraisablehook = sys.unraisablehook, errors.append
+    try:
+        grid = SharedGrid(8, 6)
+        copy = SharedGrid(8, 6, name=grid.name)
+        copy[3][2] = 7
+        assert grid[3][2] == 7
+        del copy
+        gc.collect()
+        grid.close()
+    finally:
+        sys.unraisablehook = hook
+    assert errors == []
+
+
+def test_shared_grid_publish_and_read():
+    from gifmaze.grid import SharedGrid
+
+    grid = SharedGrid(10, 5, tile=4)
+    try:
+        grid[2][1] = 3
+        generation, rows = grid.read_region(1, 1, 6, 2)
+        assert generation == 0
+        # the rows are views of the published buffer, split by the tiles.
+        assert [[len(segment) for segment in row] for row in rows] == [[3, 3]] * 2
+        assert rows[0][0][1] == 0
+        assert grid.publish(0, 0, 9, 4) == 1
+        assert rows[0][0][1] == 3
+
+        snapshot = GridSnapshot(Maze(11, 5, None), (1, 1, 6, 2), generation, rows)
+        assert list(snapshot.get_row(1, 1, 6)) == [0, 3, 0, 0, 0, 0]
+        assert list(snapshot.get_row(1, 2, 5)) == [3, 0, 0, 0]
+        assert list(snapshot.get_row(2, 4, 4)) == [0]
+        del rows, snapshot
+    finally:
+        grid.close()
+
+
+def test_tiled_grid_rows(tmp_path):
+    grid = TiledGrid(9, 7, str(tmp_path / 'grid'), tile=4)
+    try:
+        grid.write_row(3, 2, [1, 2, 3, 4, 5])
+        assert [grid[x][3] for x in range(9)] == [0, 0, 1, 2, 3, 4, 5, 0, 0]
+    finally:
+        grid.close()
+
+
+def test_search_tree():
+    from gifmaze.grid import SearchTree
+
+    tree = SearchTree(9, 7)
+    tree.add((4, 2))
+    parents = {(2, 2): (4, 2), (6, 2): (4, 2), (4, 0): (4, 2), (4, 4): (4, 2),
+               (0, 2): (2, 2), (0, 4): (0, 2), (8, 6): (8, 4), (8, 4): (6, 4),
+               (6, 4): (6, 2)}
+    for cell in [(2, 2), (6, 2), (4, 0), (4, 4), (0, 2), (0, 4), (6, 4), (8, 4), (8, 6)]:
+        tree.add(cell, parents[cell])
+
+    assert (2, 4) not in tree and (8, 6) in tree
+    assert tree.parent((4, 2)) == (4, 2)
+    assert all(tree.parent(cell) == parent for cell, parent in parents.items())
+    assert tree.path((8, 6)) == [(8, 6), (8, 4), (6, 4), (6, 2), (4, 2)]
+    with pytest.raises(ValueError):
+        tree.path((2, 4))
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+import os
+import subprocess
+import sys
+
+import gifmaze
+
+
+def test_optional_modules_are_not_imported():
+    code = ('import sys, gifmaze; '
+            'print(sorted(m for m in ("PIL", "tqdm", "numpy") if m in sys.modules))')
+    root = os.path.dirname(gifmaze.__path__[0])
+    result = subprocess.run([sys.executable, '-c', code], cwd=root,
+                            capture_output=True, text=True)
+    assert result.stdout.strip() == '[]', result.stderr
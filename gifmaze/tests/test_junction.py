@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from gifmaze import Maze
+from gifmaze.algorithms import wilson
+
+
+def perfect_maze():
+    maze = Maze(31, 21, None)
+    for _ in wilson(maze, lambda maze: maze.reset(), seed=3):
+        pass
+    return maze
+
+
+def passages(maze, cell):
+    return [v for v in maze.get_neighbors(cell) if not maze.barrier(cell, v)]
+
+
+def test_nodes_and_corridors():
+    maze = perfect_maze()
+    start, end = (0, 0), (30, 20)
+    graph = maze.junction_graph(terminals=[start, end])
+
+    expected = set(c for c in maze.cells if len(passages(maze, c)) != 2) | {start, end}
+    assert set(graph.nodes) == expected
+    corridors = 0
+    for u, edges in graph.nodes.items():
+        for v, length, first in edges:
+            cells = graph.corridor(u, first)
+            assert cells[-1] == v and len(cells) == length
+            assert all(c not in graph.nodes for c in cells[:-1])
+            corridors += 1
+    # a tree with n cells has n - 1 passages, each corridor is seen from both ends.
+    assert corridors == 2 * (len(graph) - 1)
+
+
+@pytest.mark.parametrize('depth_first', [False, True])
+def test_search_and_path(depth_first):
+    maze = perfect_maze()
+    start, end = (0, 0), (30, 20)
+    graph = maze.junction_graph(terminals=[start, end])
+    parents = {}
+    reached = [v for u, first, v, dist in graph.search(start, parents, depth_first, end)]
+    assert reached[-1] == end
+
+    path = graph.path(parents, end)
+    assert path[0] == start and path[-1] == end
+    assert len(set(path)) == len(path)
+    assert all(not maze.barrier(u, v) for u, v in zip(path, path[1:]))
+
+    inner = next(c for c in maze.cells if c not in graph.nodes)
+    with pytest.raises(ValueError):
+        list(graph.search(inner, {}))
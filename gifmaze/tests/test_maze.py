@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from gifmaze import Maze
+from gifmaze.algorithms import prim, bfs
+from gifmaze.grid import MaskedGraph
+
+
+def reset(maze):
+    maze.reset()
+
+
+def grid(maze):
+    return [maze.get_row(y, 0, maze.width - 1) for y in range(maze.height)]
+
+
+def solved_maze(**kwargs):
+    maze = Maze(21, 15, None, **kwargs)
+    for _ in prim(maze, reset, seed=1):
+        pass
+    # bfs marks the cells with their distances, up to 3 + 87.
+    for _ in bfs(maze, reset, start=(0, 0), end=(20, 14)):
+        pass
+    return maze
+
+
+@pytest.mark.parametrize('tiled', [False, True])
+def test_save_and_load_state(tmp_path, tiled):
+    maze = solved_maze()
+    filename = str(tmp_path / 'maze.bin')
+    maze.save_state(filename)
+
+    grid_file = str(tmp_path / 'grid') if tiled else None
+    loaded = Maze.load_state(filename, grid_file=grid_file, tile=4)
+    assert grid(loaded) == grid(maze)
+    assert list(loaded.cells) == list(maze.cells)
+    assert loaded.get_neighbors((4, 6)) == maze.get_neighbors((4, 6))
+    assert loaded.frame_box is None and loaded.num_changes == 0
+    # the attributes set by `__init__` are there.
+    assert vars(Maze(21, 15, None, implicit=True)).keys() == vars(loaded).keys()
+    loaded.close()
+
+
+def test_save_and_load_state_with_2_bits(tmp_path):
+    maze = Maze(21, 15, None)
+    for _ in prim(maze, reset, seed=1):
+        pass
+    filename = str(tmp_path / 'maze.bin')
+    maze.save_state(filename)
+    # 4 cells per byte after the 14 bytes of the header.
+    with open(filename, 'rb') as f:
+        assert len(f.read()) == 14 + 15 * 6
+    assert grid(Maze.load_state(filename)) == grid(maze)
+
+
+def test_load_state_of_a_masked_maze(tmp_path):
+    maze = Maze(21, 15, None)
+    bitmap = bytearray([0xFF] * 11)
+    bitmap[0] &= ~1  # remove the cell (0, 0)
+    maze._graph = MaskedGraph(21, 15, bitmap)
+    maze.cells = maze._graph.cells()
+    for _ in prim(maze, reset, start=(2, 0), seed=1):
+        pass
+    filename = str(tmp_path / 'maze.bin')
+    maze.save_state(filename)
+
+    loaded = Maze.load_state(filename)
+    assert grid(loaded) == grid(maze)
+    assert (0, 0) not in list(loaded.cells)
+    assert loaded.get_neighbors((2, 0)) == maze.get_neighbors((2, 0))
+
+
+def split_mask():
+    """A mask whose black column at x = 10 cuts the maze into two halves."""
+    Image = pytest.importorskip('PIL.Image')
+    mask = Image.new('L', (21, 15), 255)
+    for y in range(15):
+        mask.putpixel((10, y), 0)
+    return mask
+
+
+def test_disconnected_mask_is_rejected():
+    with pytest.raises(ValueError):
+        Maze(21, 15, split_mask())
+
+
+def test_mask_restricted_to_a_component():
+    maze = Maze(21, 15, split_mask(), root=(12, 0))
+    assert len(maze.cells) == 5 * 8
+    assert all(x > 10 for x, y in maze.cells)
+    for _ in prim(maze, reset, start=(12, 0), seed=1):
+        pass
+    assert sum(row.count(Maze.TREE) for row in grid(maze)) == 2 * 5 * 8 - 1
+
+    with pytest.raises(ValueError):
+        Maze(21, 15, split_mask(), root=(10, 0))
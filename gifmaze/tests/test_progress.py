@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from gifmaze import Maze, progress
+from gifmaze.algorithms import prim, random_dfs, wilson, kruskal, bfs, dfs, astar
+from gifmaze.distance import DistanceIndex
+
+
+class Render(object):
+    """A render that only resets the maze and carries a progress reporter."""
+
+    def __init__(self):
+        self.progress = progress.Progress(interval=float('inf'))
+
+    def __call__(self, maze):
+        maze.reset()
+
+
+def run(algo, maze, **kwargs):
+    render = Render()
+    for _ in algo(maze, render, **kwargs):
+        pass
+    return render.progress
+
+
+def perfect_maze():
+    maze = Maze(21, 15, None)
+    run(prim, maze, seed=1)
+    return maze
+
+
+@pytest.mark.parametrize('algo', [prim, random_dfs, wilson, kruskal])
+def test_generators_reach_their_totals(algo):
+    reporter = run(algo, Maze(21, 15, None), seed=2)
+    assert reporter.cells == reporter.total == 11 * 8 - 1
+
+
+@pytest.mark.parametrize('mode', ['search', 'index', 'graph'])
+def test_bfs_reaches_its_total(mode):
+    maze = perfect_maze()
+    kwargs = {'start': (0, 0), 'end': (20, 14)}
+    if mode == 'index':
+        kwargs['index'] = DistanceIndex(maze, (0, 0))
+    elif mode == 'graph':
+        kwargs['graph'] = maze.junction_graph(terminals=[(0, 0), (20, 14)])
+    reporter = run(bfs, maze, **kwargs)
+    assert reporter.cells == reporter.total == 11 * 8 - 1
+
+
+@pytest.mark.parametrize('algo', [dfs, astar])
+def test_solvers_do_not_exceed_their_totals(algo):
+    reporter = run(algo, perfect_maze(), start=(0, 0), end=(20, 14))
+    assert 0 < reporter.cells <= reporter.total == 11 * 8 - 1
+
+
+def test_default_progress(monkeypatch):
+    monkeypatch.setattr(progress, 'find_spec', lambda name: None)
+    assert isinstance(progress.default_progress(), progress.NullProgress)
+    monkeypatch.setattr(progress, 'find_spec', lambda name: object())
+    assert isinstance(progress.default_progress(), progress.TqdmProgress)
+    monkeypatch.setattr(progress, 'enabled', False)
+    assert isinstance(progress.default_progress(), progress.NullProgress)
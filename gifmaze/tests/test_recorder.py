@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from gifmaze import Maze
+from gifmaze.algorithms import prim
+from gifmaze.recorder import EventLog, record, replay
+
+
+def grid(maze):
+    return [maze.get_row(y, 0, maze.width - 1) for y in range(maze.height)]
+
+
+class FrameCounter(object):
+    """A render that counts the frames and resets the maze."""
+
+    def __init__(self):
+        self.frames = 0
+
+    def __call__(self, maze):
+        self.frames += 1
+        maze.reset()
+
+
+@pytest.mark.parametrize('name', ['binary_tree', 'sidewinder'])
+def test_record_and_replay_bulk_algorithms(tmp_path, name):
+    pytest.importorskip('numpy')
+    from gifmaze import algorithms
+    algo = getattr(algorithms, name)
+
+    maze = Maze(31, 21, None)
+    log = record(algo, maze, speed=2, seed=1)
+    # the cells of the 16x11 maze and the passages between them.
+    assert len(log) == 2 * 16 * 11 - 1
+
+    filename = str(tmp_path / 'run.log')
+    log.save(filename)
+    copy = Maze(31, 21, None)
+    for _ in replay(copy, FrameCounter(), EventLog.load(filename)):
+        pass
+    assert grid(copy) == grid(maze)
+
+
+def test_record_and_replay_with_speed():
+    maze = Maze(21, 15, None)
+    log = record(prim, maze, seed=3)
+    assert len(log.frames) > 0
+
+    copy = Maze(21, 15, None)
+    render = FrameCounter()
+    for _ in replay(copy, render, log, speed=10):
+        pass
+    assert grid(copy) == grid(maze)
+    assert render.frames == -(-len(log) // 10)
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from array import array
+
+import pytest
+
+from gifmaze.rng import RandomSource
+
+
+@pytest.mark.parametrize('n', [0, 1, 3, 4, 5, 50])
+def test_shuffle_lists_and_arrays(n):
+    items = list(range(n))
+    rng1, rng2 = RandomSource(3), RandomSource(3)
+    shuffled = items[:]
+    rng1.shuffle(shuffled)
+    shuffled_array = array('I', items)
+    rng2.shuffle(shuffled_array)
+    assert sorted(shuffled) == items
+    assert list(shuffled_array) == shuffled
+
+
+def test_all_orders_and_choices():
+    rng = RandomSource(1)
+    orders = set()
+    for _ in range(500):
+        seq = [0, 1, 2]
+        rng.shuffle(seq)
+        orders.add(tuple(seq))
+    assert len(orders) == 6
+    assert set(rng.choice('abcd') for _ in range(200)) == set('abcd')
+
+
+def test_seed_value():
+    assert RandomSource(42).seed_value == 42
+    assert RandomSource(42).random() == RandomSource(42).random()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+import gifmaze
+from gifmaze import GIFSurface, Animation, Maze, decoder
+from gifmaze.algorithms import prim
+
+
+server = pytest.importorskip('gifmaze.server')
+
+
+def scene():
+    surface = GIFSurface(66, 46, bg_color=0)
+    surface.set_palette('kw')
+
+    def animate(surface):
+        maze = Maze(31, 21, None).scale(2).translate((2, 2))
+        Animation(surface).run(prim, maze, speed=30, delay=5, mcl=2, seed=1, progress=False)
+
+    return surface, animate
+
+
+async def fetch(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write('GET {} HTTP/1.1\r\nHost: localhost\r\n\r\n'.format(path).encode('ascii'))
+    await writer.drain()
+    status = (await reader.readline()).decode('ascii').split(None, 1)[1].strip()
+    while (await reader.readline()) not in (b'\r\n', b''):
+        pass
+
+    body = bytearray()
+    if status.startswith('200'):
+        while True:
+            size = int(await reader.readline(), 16)
+            if size == 0:
+                break
+            body += await reader.readexactly(size)
+            await reader.readline()
+    writer.close()
+    return status, bytes(body)
+
+
+def test_server_streams_the_animation():
+    gif_server = server.GIFServer({'/prim.gif': scene})
+
+    async def main():
+        listening = await gif_server.start(port=0)
+        port = listening.sockets[0].getsockname()[1]
+        try:
+            return await fetch(port, '/prim.gif'), await fetch(port, '/nothing.gif')
+        finally:
+            listening.close()
+            await listening.wait_closed()
+
+    (status, body), (missing, _) = asyncio.run(main())
+    gif_server._executor.shutdown()
+    assert status == '200 OK'
+    assert missing == '404 Not Found'
+
+    expected, animate = scene()
+    animate(expected)
+    gif = decoder.parse(body)
+    assert len(gif.frames) > 1
+    assert body == bytes(expected._gif_header + expected._io.getvalue() + b'\x3B')
+
+
+def test_server_is_not_imported_by_the_package():
+    code = 'import sys, gifmaze; print("gifmaze.server" in sys.modules)'
+    root = os.path.dirname(gifmaze.__path__[0])
+    result = subprocess.run([sys.executable, '-c', code], cwd=root,
+                            capture_output=True, text=True)
+    assert result.stdout.strip() == 'False'
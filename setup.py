@@ -15,5 +15,6 @@ setup(
     author_email='mathzhaoliang@gmail.com',
     url='https://github.com/neozhaoliang/gifmaze',
     license='MIT',
-    packages=find_packages()
+    packages=find_packages(),
+    extras_require={'numpy': ['numpy']}
     )